@@ -3,7 +3,9 @@
 require_once 'vendor/autoload.php';
 
 $client = new GuzzleHttp\Client();
+// raw_text is only returned by the legacy parser (app_old.py) for debug requests
 $response = $client->post('http://localhost:5000/parse-invoice', [
+    'query' => ['debug' => 1],
     'multipart' => [
         [
             'name'     => 'file',
@@ -1,53 +1,113 @@
-from flask import Flask, request, jsonify
-import json
+from flask import Flask, Response, request, jsonify
+import io
 import os
-import tempfile
 import logging
 import sys
+from typing import Tuple, Union
 
 # Add src directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.invoice_processor import InvoiceProcessor
-from src.utils.helpers import decimal_to_string_default
+from src.utils.helpers import to_json_bytes
 from src.utils.config import ConfigManager
+from src.utils.response_cache import ResponseCache, content_key
 
 # Initialize Flask app
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-# Set our app loggers to DEBUG for detailed extraction logging
-logging.getLogger('src.extractors.table_extractor').setLevel(logging.DEBUG)
-logging.getLogger('src.invoice_processor').setLevel(logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Pipeline log level; set INVOICE_PARSER_LOG_LEVEL=DEBUG for detailed extraction logging
+_log_level_name = (os.environ.get('INVOICE_PARSER_LOG_LEVEL') or 'INFO').upper()
+_log_level = logging.getLevelName(_log_level_name)
+if not isinstance(_log_level, int):
+    logger.warning("Invalid INVOICE_PARSER_LOG_LEVEL '%s', using INFO", _log_level_name)
+    _log_level = logging.INFO
+logging.getLogger('src').setLevel(_log_level)
+
 # Initialize invoice processor with configuration
 config = ConfigManager.load_config()
 invoice_processor = InvoiceProcessor(config)
 
+# Per-worker cache of serialized /parse-invoice responses, keyed by upload content
+response_cache = ResponseCache(maxsize=config.response_cache_size)
+
+# Health status and configuration are fixed for the life of the process, so serialize them once
+_HEALTH_JSON = to_json_bytes({
+    'status': 'healthy', 
+    'service': 'invoice-pdf-parser', 
+    'version': '2.0',
+    'architecture': 'modular-step-based'
+})
+_CONFIG_JSON = to_json_bytes({
+    'ocr_validation_enabled': config.enable_ocr_validation,
+    'ocr_confidence_threshold': config.ocr_confidence_threshold,
+    'table_extraction_flavor': config.table_extraction_flavor,
+    'line_scale': config.line_scale,
+    'max_pages_to_process': config.max_pages_to_process,
+    'page_workers': config.page_workers,
+    'response_cache_size': config.response_cache_size,
+    'validate_checksums': config.validate_checksums
+})
+
+
+_PDF_MAGIC = b'%PDF-'
+_PDF_HEADER_WINDOW = 1024
+
+
+def _validate_and_read_pdf(req) -> Union[Tuple[bytes, str], Response]:
+    """
+    Validate the uploaded PDF and read it into memory.
+    Returns (data, filename) on success, or an error response the route can return as-is.
+    """
+    if 'file' not in req.files:
+        logger.warning("No 'file' part in the request.")
+        return _error_response(400, 'No file uploaded',
+                               'Please ensure the POST request includes a file with key "file".')
+
+    file = req.files['file']
+    if not file or file.filename == '':
+        logger.warning("No file selected for uploading.")
+        return _error_response(400, 'No file selected', 'Please select a PDF file to upload.')
+
+    if not file.filename.lower().endswith('.pdf'):
+        logger.warning("Invalid file type: %s", file.filename)
+        return _error_response(400, 'Invalid file type',
+                               'Only PDF files are supported. Received: ' + file.filename)
+
+    # Reject non-PDF content before reading the rest of the upload or running the pipeline.
+    # Readers accept the header anywhere in the first 1024 bytes, so allow leading junk too.
+    head = file.stream.read(_PDF_HEADER_WINDOW)
+    if _PDF_MAGIC not in head:
+        logger.warning("Uploaded file is not a PDF: %s", file.filename)
+        return _error_response(400, 'Not a PDF',
+                               'The uploaded file does not look like a PDF document: ' + file.filename)
+
+    logger.info("Processing uploaded file: %s", file.filename)
+
+    # Process the upload in memory instead of round-tripping through a temp file
+    return head + file.stream.read(), file.filename
+
+
+def _error_response(status: int, error: str, message: str) -> Response:
+    """Build a JSON error response for a rejected upload."""
+    response = jsonify({'success': False, 'error': error, 'message': message})
+    response.status_code = status
+    return response
+
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({
-        'status': 'healthy', 
-        'service': 'invoice-pdf-parser', 
-        'version': '2.0',
-        'architecture': 'modular-step-based'
-    })
+    return app.response_class(response=_HEALTH_JSON, status=200, mimetype='application/json')
 
 
 @app.route('/config', methods=['GET'])
 def get_config():
     """Get current configuration (for debugging)."""
-    return jsonify({
-        'ocr_validation_enabled': config.enable_ocr_validation,
-        'ocr_confidence_threshold': config.ocr_confidence_threshold,
-        'table_extraction_flavor': config.table_extraction_flavor,
-        'line_scale': config.line_scale,
-        'max_pages_to_process': config.max_pages_to_process,
-        'validate_checksums': config.validate_checksums
-    })
+    return app.response_class(response=_CONFIG_JSON, status=200, mimetype='application/json')
 
 
 @app.route('/parse-invoice', methods=['POST'])
@@ -61,57 +121,41 @@ def parse_invoice_route():
     3. Validate with OCR
     4. Compile final response
     """
-    logger.info(f"Received request to /parse-invoice from {request.remote_addr}")
+    logger.info("Received request to /parse-invoice from %s", request.remote_addr)
     
     try:
-        # Validate request
-        if 'file' not in request.files:
-            logger.warning("No 'file' part in the request.")
-            return jsonify({
-                'success': False, 
-                'error': 'No file uploaded',
-                'message': 'Please ensure the POST request includes a file with key "file".'
-            }), 400
-
-        file = request.files['file']
-        if not file or file.filename == '':
-            logger.warning("No file selected for uploading.")
-            return jsonify({
-                'success': False, 
-                'error': 'No file selected',
-                'message': 'Please select a PDF file to upload.'
-            }), 400
-
-        if not file.filename.lower().endswith('.pdf'):
-            logger.warning(f"Invalid file type: {file.filename}")
-            return jsonify({
-                'success': False, 
-                'error': 'Invalid file type',
-                'message': 'Only PDF files are supported. Received: ' + file.filename
-            }), 400
-
-        logger.info(f"Processing uploaded file: {file.filename}")
-
-        # Process file using temporary storage
-        with tempfile.NamedTemporaryFile(delete=True, suffix='.pdf') as tmp_file_obj:
-            file.save(tmp_file_obj.name)
-            
-            logger.info(f"Parsing PDF at temporary path: {tmp_file_obj.name}")
-            
-            # Process through the new modular pipeline
-            laravel_response = invoice_processor.process_invoice(tmp_file_obj.name)
-            
-            logger.info(f"Processing complete for {file.filename}. Success: {laravel_response.get('success', False)}")
-            
-            # Return JSON response with proper Decimal serialization
-            return app.response_class(
-                response=json.dumps(laravel_response, default=decimal_to_string_default),
-                status=200,
-                mimetype='application/json'
-            )
+        upload = _validate_and_read_pdf(request)
+        if not isinstance(upload, tuple):
+            return upload
+        data, filename = upload
+        
+        # Identical uploads (e.g. client retries) are answered from the cache
+        cache_key = content_key(data)
+        cached_body = response_cache.get(cache_key)
+        if cached_body is not None:
+            logger.info("Returning cached response for %s (%s)", filename, cache_key)
+            return app.response_class(response=cached_body, status=200, mimetype='application/json')
+        
+        # Process through the new modular pipeline
+        laravel_response = invoice_processor.process_invoice(io.BytesIO(data))
+        
+        logger.info("Processing complete for %s. Success: %s", filename, laravel_response.get('success', False))
+        
+        # Serialize with proper Decimal handling; the result depends only on the PDF bytes
+        body = to_json_bytes(laravel_response)
+        # A pipeline failure may be transient (e.g. a full spill directory), so it is not cached;
+        # completed parses are, even with success=False from deterministic validation warnings
+        if laravel_response.get('data', {}).get('extraction_method') != 'failed':
+            response_cache.put(cache_key, body)
+        
+        return app.response_class(
+            response=body,
+            status=200,
+            mimetype='application/json'
+        )
 
     except Exception as e:
-        logger.error(f"Unhandled error in /parse-invoice endpoint: {e}", exc_info=True)
+        logger.error("Unhandled error in /parse-invoice endpoint: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': 'Internal Server Error: ' + str(e),
@@ -125,39 +169,28 @@ def parse_invoice_stats():
     Parse invoice and return processing statistics.
     Useful for monitoring and debugging.
     """
-    logger.info(f"Received request to /parse-invoice/stats from {request.remote_addr}")
+    logger.info("Received request to /parse-invoice/stats from %s", request.remote_addr)
     
     try:
         # Same validation as main endpoint
-        if 'file' not in request.files:
-            return jsonify({'success': False, 'error': 'No file uploaded'}), 400
-
-        file = request.files['file']
-        if not file or file.filename == '' or not file.filename.lower().endswith('.pdf'):
-            return jsonify({'success': False, 'error': 'Invalid file'}), 400
-
-        with tempfile.NamedTemporaryFile(delete=True, suffix='.pdf') as tmp_file_obj:
-            file.save(tmp_file_obj.name)
-            
-            # Process and get stats
-            laravel_response = invoice_processor.process_invoice(tmp_file_obj.name)
-            
-            # Create a mock ExtractionResult for stats (simplified)
-            from src.models.invoice_models import ExtractionResult
-            extraction_result = ExtractionResult(success=laravel_response['success'])
-            extraction_result.parsing_errors = laravel_response['data'].get('parsing_errors', [])
-            extraction_result.validation_checksum_ok = laravel_response['data'].get('validation_checksum_ok', False)
-            
-            stats = invoice_processor.get_processing_stats(extraction_result)
-            
-            return jsonify({
-                'success': laravel_response['success'],
-                'stats': stats,
-                'message': laravel_response.get('message', '')
-            })
+        upload = _validate_and_read_pdf(request)
+        if not isinstance(upload, tuple):
+            return upload
+        data, _ = upload
+        
+        # Process and compute stats from the pipeline's own ExtractionResult
+        laravel_response, extraction_result = invoice_processor.process_invoice_with_result(io.BytesIO(data))
+        
+        stats = invoice_processor.get_processing_stats(extraction_result)
+        
+        return jsonify({
+            'success': laravel_response['success'],
+            'stats': stats,
+            'message': laravel_response.get('message', '')
+        })
 
     except Exception as e:
-        logger.error(f"Error in /parse-invoice/stats endpoint: {e}", exc_info=True)
+        logger.error("Error in /parse-invoice/stats endpoint: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -165,6 +198,7 @@ def parse_invoice_stats():
 
 
 if __name__ == '__main__':
-    # For local development. Use Gunicorn or similar in production.
+    # Serve through Gunicorn so concurrent requests are parsed in parallel workers
     logger.info("Starting Invoice Parser Service v2.0 with modular architecture")
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    os.execvp('gunicorn', ['gunicorn', '-c', 'gunicorn_conf.py', 'app:app'])
\ No newline at end of file
@@ -1,53 +1,177 @@
 from flask import Flask, request, jsonify
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge
 import re
 import json
 from io import StringIO
-import pandas as pd
 from decimal import Decimal, InvalidOperation # Keep InvalidOperation for clarity
 import os
 import tempfile
 import logging
 import traceback
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, wait
 
 # For text extraction
-from pdfminer.high_level import extract_text
+from pdfminer.converter import TextConverter
 from pdfminer.layout import LAParams
-
-# For table extraction
-import camelot
-
-# For page count
-from PyPDF2 import PdfReader
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+
+# Faster JSON encoding when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional faster text backend (selected with TEXT_BACKEND=pypdfium2; install pypdfium2 separately,
+# it is not in requirements.txt since the production image runs app.py)
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+
+# Camelot (which pulls in pandas and OpenCV) is imported on first use inside the extraction
+# helpers below, so worker start-up and /health stay fast
+# Lattice keeps each page's rendered image on its tables until read_pdf returns, so long
+# PDFs are read this many pages at a time to bound peak memory
+_CAMELOT_PAGE_BATCH = 4
 
 app = Flask(__name__)
+# Reject oversized uploads before they are read; Werkzeug already spools file parts beyond 500 KB to disk
+MAX_UPLOAD_MB = int(os.environ.get('MAX_UPLOAD_MB', '50'))
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_MB * 1024 * 1024
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Text extraction backend: "pdfminer" (default; the patterns below were written against its layout)
+# or "pypdfium2" (much faster, falls back to pdfminer if it fails)
+TEXT_BACKEND = os.environ.get('TEXT_BACKEND', 'pdfminer').lower()
+
+# Batch uploads are parsed in worker processes; a slow PDF gets an error entry after this many seconds
+PARSE_BATCH_TIMEOUT = float(os.environ.get('PARSE_BATCH_TIMEOUT', '300'))
+_PARSE_POOL = None # Created lazily by _get_parse_pool()
+_PARSE_POOL_LOCK = threading.Lock()
+
+# Uploads are copied to their temporary files in chunks of this size
+_UPLOAD_CHUNK_SIZE = 1 << 20
+# Keep upload temp files on tmpfs when available, so the write and Camelot's re-read stay in RAM.
+# PDF_SPILL_DIR overrides the directory; when it is full, uploads go to the default temp directory.
+_UPLOAD_DIR = os.environ.get('PDF_SPILL_DIR') or ('/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+# Per-process LRU of Laravel-format results keyed by the SHA-256 of the uploaded PDF
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', '512'))
+_RESULT_CACHE = OrderedDict()
+_RESULT_CACHE_LOCK = threading.Lock()
+
+# --- Compiled Patterns ---
+# Compiled once at import; the parser runs these against every invoice and page.
+_RE_NUMERIC_FALLBACK = re.compile(r'([-+]?\d*\.?\d+)')
+_ITALIAN_DECIMAL_TRANS = str.maketrans({'.': None, ',': '.'})
+
+# Page 1 header
+_RE_VENDOR_ADDR = re.compile(r"MANIFATTURE DI SAN MARINO\s*\n(.*?REP\. SAN MARINO.*?)\n", re.DOTALL)
+_RE_DOCUMENT_TYPE = re.compile(r"LISTA VALORIZZATA \(Fattura proforma\)")
+_RE_INVOICE_NUM = re.compile(r"N° doc:\s*(LV\s*/\s*\d+)")
+_RE_DATE = re.compile(r"Del:\s*(\d{2}-\d{2}-\d{4})")
+_RE_CURRENCY = re.compile(r"Divisa:\s*([A-Z]{3})")
+# The stricter "([A-Z0-9]+)" variants can only match where these already do, so they are not repeated
+_RE_CUSTOMER_CODES = tuple(re.compile(p) for p in (
+    r"Cliente:\s*(\S+)",      # Cliente: MSCE00068
+    r"Codice:\s*(\S+)"        # Codice: MSCE00068
+))
+_RE_CUSTOMER_BLOCK = re.compile(
+    r"Spett\.le:\s*\n(.*?)\n(STR\..*?)\n(\d+\s+[\w\s]+?)\n([\w\s]+?)\n.*?P\.IVA UE:\s*(\S+)",
+    re.DOTALL | re.IGNORECASE
+)
+_RE_CUSTOMER_NAME = re.compile(r"Spett\.le:\s*\n([^\n]+)")
+_RE_CUSTOMER_VAT = re.compile(r"P\.IVA UE:\s*(\S+)")
+_RE_ADDR_STREET = re.compile(r"(STR\.[^\n]+)")
+_RE_ADDR_POSTAL = re.compile(r"(\d{6}\s+[A-Z]+)")
+_RE_ADDR_COUNTRY = re.compile(r"\n([A-Z]{2,}(?:\s+[A-Z]+)*)\s*\n")
+
+# Section headers
+_RE_SECTION_HEADER_PRIMARY = re.compile(
+    r"LISTA VALORIZZATA.*?del DDT interno\s*(MS\w+\s*\d+)\s*Del:\s*(\d{2}-\d{2}-\d{4})\s*Causale\s*(\w+)\s*\n"
+    r"Materiali per la confezione del mod\.\s*(.*?)\s*Tessuto:\s*(.*?)\n",
+    re.DOTALL
+)
+_RE_SECTION_HEADER_ALT = re.compile(
+    r"(MS\w+\s*\d+)\s*Del:\s*(\d{2}-\d{2}-\d{4})\s*Causale\s*(\w+)\s*\n"
+    r"Materiali per la confezione del mod\.\s*(.*?)\s*Tessuto:\s*(.*?)\n",
+    re.DOTALL
+)
+
+# Filename fallbacks
+_RE_FILENAME_TOTAL = re.compile(r"([\d\.,]+)\s*€")          # "15473.37 €"
+_RE_FILENAME_PACKAGES = re.compile(r"(\d+)\s*colli")         # "46 colli"
+_RE_FILENAME_NET = re.compile(r"\(([\d\.,]+)\s*Kg_N")       # "(297.50 Kg_N"
+_RE_FILENAME_GROSS = re.compile(r"([\d\.,]+)\s*Kg_B\)")      # "328 Kg_B)"
+
+# Footer (last pages)
+_RE_TOTAL_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r"Tot\s*importo:\s*\(\s*EUR\s*\)\s*([\d\.,]+)",  # Exact: "Tot importo: ( EUR ) 15.473,37"
+    r"Tot(?:ale)?\s*importo:\s*\(\s*EUR\s*\)\s*([\d\.,]+)",
+    r"Tot(?:ale)?\s*importo:\s*([\d\.,]+)",
+    r"Totale:\s*([\d\.,]+)",  # Also covers "TOTALE:" (case-insensitive)
+    r"Total:\s*([\d\.,]+)"
+))
+_RE_PORTO = re.compile(r"Porto:\s*(.*)")
+_RE_PACKAGE_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r"Numero colli:\s*(\d+)",  # Exact: "Numero colli: 46"
+    r"Numero\s*colli:\s*(\d+)",
+    r"N\.\s*colli:\s*(\d+)",
+    r"Colli:\s*(\d+)",
+    r"(\d+)\s*colli"
+))
+_RE_NET_WEIGHT_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r"Peso netto \( KG \):\s*([\d\.,]+)",  # Exact: "Peso netto ( KG ): 297,5"
+    r"Peso\s*netto\s*\(\s*KG\s*\):\s*([\d\.,]+)",
+    r"Peso\s*netto:\s*([\d\.,]+)",
+    r"Net\s*weight:\s*([\d\.,]+)",
+    r"([\d\.,]+)\s*Kg[_\s]*N"
+))
+_RE_GROSS_WEIGHT_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r"Peso lordo \( KG \):\s*([\d\.,]+)",  # Exact: "Peso lordo ( KG ): 328"
+    r"Peso\s*lordo\s*\(\s*KG\s*\):\s*([\d\.,]+)",
+    r"Peso\s*lordo:\s*([\d\.,]+)",
+    r"Gross\s*weight:\s*([\d\.,]+)",
+    r"([\d\.,]+)\s*Kg[_\s]*B"
+))
+_RE_TOTAL_FALLBACK = re.compile(r"Tot(?:ale)?\s*importo:\s*\(EUR\)\s*([\d\.,]+)", re.IGNORECASE)
+
 # --- Helper Functions ---
 def parse_italian_decimal(text_value):
     """Converts Italian-style numbers (e.g., '1.234,56') to Decimal. Returns None if invalid."""
-    if text_value is None:
-        return None
-    if isinstance(text_value, Decimal): # Already a Decimal
-        return text_value
-    if isinstance(text_value, (int, float)): # Convert standard numbers to Decimal
-        return Decimal(str(text_value)) # Convert to string first for float precision
-    if not isinstance(text_value, str):
+    if not isinstance(text_value, str): # Strings (table cells) are by far the most common input
+        if text_value is None:
+            return None
+        if isinstance(text_value, Decimal): # Already a Decimal
+            return text_value
+        if isinstance(text_value, (int, float)): # Convert standard numbers to Decimal
+            return Decimal(str(text_value)) # Convert to string first for float precision
         logger.warning(f"parse_italian_decimal received non-string/non-numeric type: {type(text_value)}")
         return None
+    return _parse_italian_decimal_str(text_value)
 
+@lru_cache(maxsize=4096)
+def _parse_italian_decimal_str(text_value):
+    """String case of parse_italian_decimal, memoized: invoices repeat the same cell values
+    (e.g. '0,00', unit prices) and Decimal results are immutable, so they can be shared."""
     cleaned_value = text_value.strip()
     if not cleaned_value:
         return None
 
     try:
-        # Standardize: remove thousand separators (.), then replace decimal comma (,) with a period (.)
-        standardized_value = cleaned_value.replace('.', '').replace(',', '.')
-        return Decimal(standardized_value)
+        # Standardize in one pass: drop thousand separators (.), turn the decimal comma (,) into a period (.)
+        return Decimal(cleaned_value.translate(_ITALIAN_DECIMAL_TRANS))
     except InvalidOperation:
         # Fallback: if there's extra text, try to extract just the numeric part
         # This regex tries to capture numbers like 1234.56 or 1234
-        match = re.search(r'([-+]?\d*\.?\d+)', cleaned_value.replace(',', '.')) # More general number match
+        match = _RE_NUMERIC_FALLBACK.search(cleaned_value.replace(',', '.')) # More general number match
         if match:
             try:
                 return Decimal(match.group(1))
@@ -57,14 +181,28 @@ def parse_italian_decimal(text_value):
         logger.warning(f"Could not parse '{cleaned_value}' as Decimal.")
         return None
 
+def _norm(text):
+    """Strip a table cell's text; returns None for empty cells and pandas' 'nan' placeholder."""
+    stripped = text.strip()
+    if not stripped or stripped.lower() == 'nan':
+        return None
+    return stripped
+
 def decimal_to_string_default(obj):
     """Helper function to serialize Decimal objects to strings for JSON."""
     if isinstance(obj, Decimal):
         return str(obj)
     raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
 
+def to_json_bytes(payload):
+    """Serializes a response payload to UTF-8 JSON with orjson if available, else the json module."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=decimal_to_string_default)
+    return json.dumps(payload, default=decimal_to_string_default).encode('utf-8')
+
 def extract_tables_from_pdf_camelot(pdf_path, page_number_str, flavor='lattice', table_areas=None, **kwargs):
     """Extracts tables using Camelot. page_number_str is 1-indexed."""
+    import camelot
     try:
         tables = camelot.read_pdf(
             pdf_path,
@@ -80,8 +218,87 @@ def extract_tables_from_pdf_camelot(pdf_path, page_number_str, flavor='lattice',
         logger.error(f"Error extracting tables with Camelot from '{os.path.basename(pdf_path)}', pages '{page_number_str}': {e}", exc_info=True)
         return []
 
-def parse_invoice_specific(pdf_path):
-    """Parses the specific PDF invoice format provided."""
+def extract_text_by_page(pdf_path):
+    """
+    Extracts the text of every page in a single pdfminer pass over the document.
+    Returns (page_texts, page_errors): page_texts[i] is the text of page i (0-indexed),
+    or None if that page failed, in which case page_errors[i] holds the exception.
+    """
+    page_texts = []
+    page_errors = {}
+    with open(pdf_path, 'rb') as fp, StringIO() as output_string:
+        rsrcmgr = PDFResourceManager(caching=True)
+        device = TextConverter(rsrcmgr, output_string, laparams=LAParams())
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        for page_idx, page in enumerate(PDFPage.get_pages(fp, caching=True)):
+            output_string.seek(0)
+            output_string.truncate()
+            try:
+                interpreter.process_page(page)
+                page_texts.append(output_string.getvalue())
+            except Exception as e:
+                page_texts.append(None)
+                page_errors[page_idx] = e
+    return page_texts, page_errors
+
+def extract_text_by_page_pdfium(pdf_path):
+    """Same as extract_text_by_page, using pypdfium2 (PDFium) instead of pdfminer."""
+    page_texts = []
+    page_errors = {}
+    pdf = pypdfium2.PdfDocument(pdf_path)
+    try:
+        for page_idx in range(len(pdf)):
+            try:
+                text = pdf[page_idx].get_textpage().get_text_range()
+                page_texts.append(text.replace('\r\n', '\n')) # PDFium ends lines with CRLF
+            except Exception as e:
+                page_texts.append(None)
+                page_errors[page_idx] = e
+    finally:
+        pdf.close()
+    return page_texts, page_errors
+
+def extract_page_texts(pdf_path):
+    """Extracts per-page text with the configured TEXT_BACKEND, falling back to pdfminer."""
+    if TEXT_BACKEND == 'pypdfium2':
+        if pypdfium2 is None:
+            logger.warning("TEXT_BACKEND=pypdfium2 but pypdfium2 is not installed; using pdfminer.")
+        else:
+            try:
+                return extract_text_by_page_pdfium(pdf_path)
+            except Exception:
+                logger.warning(f"pypdfium2 text extraction failed for {pdf_path}; retrying with pdfminer.", exc_info=True)
+    return extract_text_by_page(pdf_path)
+
+def extract_tables_by_page_camelot(pdf_path, num_pages, flavor='lattice', **kwargs):
+    """
+    Extracts tables for all pages, one Camelot call per _CAMELOT_PAGE_BATCH pages; only the
+    DataFrames are kept, so each batch's page images are freed before the next is read.
+    Returns a dict mapping 1-indexed page numbers to lists of DataFrames.
+    Falls back to one call per page if a batch call fails.
+    """
+    import camelot
+    tables_by_page = defaultdict(list)
+    for first_page in range(1, num_pages + 1, _CAMELOT_PAGE_BATCH):
+        last_page = min(first_page + _CAMELOT_PAGE_BATCH - 1, num_pages)
+        pages = f"{first_page}-{last_page}"
+        try:
+            tables = camelot.read_pdf(pdf_path, pages=pages, flavor=flavor, suppress_stdout=True, **kwargs)
+            logger.info(f"Camelot: Pages '{pages}' - Found {tables.n} tables in '{os.path.basename(pdf_path)}'.")
+            for table in tables:
+                tables_by_page[int(table.page)].append(table.df)
+            del tables # Otherwise the TableList and its page images live through the next read
+        except Exception as e:
+            logger.error(f"Error extracting tables with Camelot from '{os.path.basename(pdf_path)}', pages '{pages}': {e}. Retrying page by page.", exc_info=True)
+            for page_number in range(first_page, last_page + 1):
+                tables_by_page[page_number] = extract_tables_from_pdf_camelot(pdf_path, str(page_number), flavor=flavor, **kwargs)
+    return tables_by_page
+
+def parse_invoice_specific(pdf_path, include_raw_text=False):
+    """
+    Parses the specific PDF invoice format provided.
+    Per-page text snippets are returned in "raw_text_summary" only when include_raw_text is set.
+    """
     invoice_data = {
         "file_name": os.path.basename(pdf_path),
         "vendor_name": "MANIFATTURE DI SAN MARINO", # Fixed for this invoice type
@@ -106,59 +323,51 @@ def parse_invoice_specific(pdf_path):
         "errors": []
     }
 
+    # Extract the text of all pages in one pass (0-indexed); this pass also gives the page count
     try:
-        reader = PdfReader(pdf_path)
-        num_pages = len(reader.pages)
+        page_texts, page_errors = extract_page_texts(pdf_path)
     except Exception as e:
-        invoice_data["errors"].append(f"Critical error reading PDF for page count: {str(e)}")
-        logger.error(f"Could not read PDF for page count: {pdf_path}", exc_info=True)
+        invoice_data["errors"].append(f"Critical error reading PDF: {str(e)}")
+        logger.error(f"Could not read PDF: {pdf_path}", exc_info=True)
         return invoice_data # Early exit if PDF is unreadable
+    num_pages = len(page_texts)
+
+    # Per-page text snippets used by the footer searches below; only returned on request
+    page_text_snippets = {}
 
     # --- Parse Page 1 Header Information ---
-    try:
-        # pdfminer page_numbers are 0-indexed
-        page1_text = extract_text(pdf_path, page_numbers=[0], laparams=LAParams())
-        invoice_data["raw_text_summary"]["page1"] = page1_text[:2000] # Store a snippet
-    except Exception as e:
-        invoice_data["errors"].append(f"Error extracting text from page 1: {str(e)}")
-        logger.warning(f"Text extraction failed for page 1 of {pdf_path}", exc_info=True)
+    # Reuses the text from the single extraction pass; its snippet is stored by the page loop below
+    page1_text = page_texts[0] if page_texts else None
+    if page1_text is None:
+        invoice_data["errors"].append(f"Error extracting text from page 1: {str(page_errors.get(0, 'no text'))}")
+        logger.warning(f"Text extraction failed for page 1 of {pdf_path}")
         page1_text = "" # Allow continuation if other parts can be parsed
 
     # Extract vendor address
-    match = re.search(r"MANIFATTURE DI SAN MARINO\s*\n(.*?REP\. SAN MARINO.*?)\n", page1_text, re.DOTALL)
+    match = _RE_VENDOR_ADDR.search(page1_text)
     if match: invoice_data["vendor_address"] = match.group(1).replace('\n', ' ').strip()
 
-    match = re.search(r"LISTA VALORIZZATA \(Fattura proforma\)", page1_text)
+    match = _RE_DOCUMENT_TYPE.search(page1_text)
     if match: invoice_data["document_type"] = match.group(0).strip()
 
-    match = re.search(r"N° doc:\s*(LV\s*/\s*\d+)", page1_text)
+    match = _RE_INVOICE_NUM.search(page1_text)
     if match: invoice_data["invoice_number"] = match.group(1).replace(" ", "").strip()
 
-    match = re.search(r"Del:\s*(\d{2}-\d{2}-\d{4})", page1_text)
+    match = _RE_DATE.search(page1_text)
     if match: invoice_data["invoice_date"] = match.group(1).strip()
 
-    match = re.search(r"Divisa:\s*([A-Z]{3})", page1_text)
+    match = _RE_CURRENCY.search(page1_text)
     if match: invoice_data["currency"] = match.group(1).strip()
 
     # Try multiple patterns for customer code
-    customer_code_patterns = [
-        r"Cliente:\s*(\S+)",      # Cliente: MSCE00068
-        r"Codice:\s*(\S+)",       # Codice: MSCE00068  
-        r"Cliente:\s*([A-Z0-9]+)", # More specific pattern
-        r"Codice:\s*([A-Z0-9]+)"   # More specific pattern
-    ]
-    
-    for pattern in customer_code_patterns:
-        match = re.search(pattern, page1_text)
+    for pattern in _RE_CUSTOMER_CODES:
+        match = pattern.search(page1_text)
         if match: 
             invoice_data["customer_code"] = match.group(1).strip()
             break
 
     # Enhanced customer block extraction
-    customer_block_match = re.search(
-        r"Spett\.le:\s*\n(.*?)\n(STR\..*?)\n(\d+\s+[\w\s]+?)\n([\w\s]+?)\n.*?P\.IVA UE:\s*(\S+)",
-        page1_text, re.DOTALL | re.IGNORECASE
-    )
+    customer_block_match = _RE_CUSTOMER_BLOCK.search(page1_text)
     if customer_block_match:
         invoice_data["customer_name"] = customer_block_match.group(1).strip()
         addr_line1 = customer_block_match.group(2).strip()
@@ -168,29 +377,29 @@ def parse_invoice_specific(pdf_path):
         invoice_data["customer_vat_id"] = customer_block_match.group(5).strip()
     else:
         # Alternative customer extraction patterns
-        customer_name_match = re.search(r"Spett\.le:\s*\n([^\n]+)", page1_text)
+        customer_name_match = _RE_CUSTOMER_NAME.search(page1_text)
         if customer_name_match:
             invoice_data["customer_name"] = customer_name_match.group(1).strip()
         
         # Extract customer VAT separately
-        vat_match = re.search(r"P\.IVA UE:\s*(\S+)", page1_text)
+        vat_match = _RE_CUSTOMER_VAT.search(page1_text)
         if vat_match:
             invoice_data["customer_vat_id"] = vat_match.group(1).strip()
         
         # Extract address components separately - improved pattern
         addr_lines = []
         # Look for STR. line
-        str_match = re.search(r"(STR\.[^\n]+)", page1_text)
+        str_match = _RE_ADDR_STREET.search(page1_text)
         if str_match:
             addr_lines.append(str_match.group(1).strip())
         
         # Look for postal code and city
-        postal_match = re.search(r"(\d{6}\s+[A-Z]+)", page1_text)
+        postal_match = _RE_ADDR_POSTAL.search(page1_text)
         if postal_match:
             addr_lines.append(postal_match.group(1).strip())
         
         # Look for country
-        country_match = re.search(r"\n([A-Z]{2,}(?:\s+[A-Z]+)*)\s*\n", page1_text)
+        country_match = _RE_ADDR_COUNTRY.search(page1_text)
         if country_match:
             addr_lines.append(country_match.group(1).strip())
         
@@ -201,33 +410,27 @@ def parse_invoice_specific(pdf_path):
             invoice_data["errors"].append("Could not parse customer name from page 1.")
 
     # --- Process Sections and Line Items page by page ---
-    all_line_items_total = Decimal('0.0')
+    line_totals = [] # Summed once after all pages are processed
+    header_col_positions = {} # Table header row -> resolved column positions
     current_section_info = {} # Holds data for the section being currently parsed
 
+    # Extract tables for the whole document in one Camelot pass; line_scale is crucial for lattice
+    tables_by_page = extract_tables_by_page_camelot(pdf_path, num_pages, flavor='lattice', line_scale=30)
+
     for page_idx in range(num_pages): # pdfminer uses 0-indexed pages
-        page_num_camelot = str(page_idx + 1) # Camelot uses 1-indexed pages
-        try:
-            page_text_content = extract_text(pdf_path, page_numbers=[page_idx], laparams=LAParams())
-            invoice_data["raw_text_summary"][f"page{page_idx+1}"] = page_text_content[:5000] # Store larger snippet
-        except Exception as e:
-            invoice_data["errors"].append(f"Error extracting text from page {page_idx+1}: {str(e)}")
-            logger.warning(f"Text extraction failed for page {page_idx+1} of {pdf_path}", exc_info=True)
+        page_text_content = page_texts[page_idx] if page_idx < len(page_texts) else None
+        if page_text_content is None:
+            invoice_data["errors"].append(f"Error extracting text from page {page_idx+1}: {str(page_errors.get(page_idx, 'no text'))}")
+            logger.warning(f"Text extraction failed for page {page_idx+1} of {pdf_path}")
             continue # Skip this page if text can't be extracted
+        page_text_snippets[f"page{page_idx+1}"] = page_text_content[:5000] # Store larger snippet
 
         # Detect new section headers on the page - improved patterns
-        section_header_match = re.search(
-            r"LISTA VALORIZZATA.*?del DDT interno\s*(MS\w+\s*\d+)\s*Del:\s*(\d{2}-\d{2}-\d{4})\s*Causale\s*(\w+)\s*\n"
-            r"Materiali per la confezione del mod\.\s*(.*?)\s*Tessuto:\s*(.*?)\n",
-            page_text_content, re.DOTALL
-        )
+        section_header_match = _RE_SECTION_HEADER_PRIMARY.search(page_text_content)
         
         # Alternative section detection pattern
         if not section_header_match:
-            section_header_match = re.search(
-                r"(MS\w+\s*\d+)\s*Del:\s*(\d{2}-\d{2}-\d{4})\s*Causale\s*(\w+)\s*\n"
-                r"Materiali per la confezione del mod\.\s*(.*?)\s*Tessuto:\s*(.*?)\n",
-                page_text_content, re.DOTALL
-            )
+            section_header_match = _RE_SECTION_HEADER_ALT.search(page_text_content)
         
         # Even simpler fallback for detecting sections
         if not section_header_match and not current_section_info:
@@ -259,8 +462,7 @@ def parse_invoice_specific(pdf_path):
                 "page_origin": page_idx + 1
             }
 
-        # Extract tables using Camelot; line_scale is crucial for lattice
-        tables_dfs = extract_tables_from_pdf_camelot(pdf_path, page_num_camelot, flavor='lattice', line_scale=30)
+        tables_dfs = tables_by_page.get(page_idx + 1, []) # Camelot uses 1-indexed pages
 
         for df_table_index, df in enumerate(tables_dfs):
             if df.empty or len(df.columns) < 5: # Need at least product, qty, price, total (desc is often separate)
@@ -269,90 +471,93 @@ def parse_invoice_specific(pdf_path):
                 logger.info(msg)
                 continue
 
-            header_row_text = df.iloc[0].astype(str).str.lower().str.strip()
-            col_map = {}
-            for i, header_text in enumerate(header_row_text):
-                col_name_df = df.columns[i] # Camelot might use 0, 1, 2.. or parsed names
-                if "prodotto" in header_text: col_map['product_code_raw'] = col_name_df
-                elif "voce dog" in header_text: col_map['customs_code'] = col_name_df
-                elif header_text == "um": col_map['unit_measure'] = col_name_df
-                elif "qtà fatt" in header_text: col_map['quantity'] = col_name_df
-                elif "prezzo unitario" in header_text: col_map['unit_price'] = col_name_df
-                elif "importo" in header_text: col_map['line_total'] = col_name_df
-
-            # Fallback to positional mapping if key headers are missing
-            # This invoice format should have consistent headers, but this adds a bit of resilience.
-            required_cols_by_name = ['product_code_raw', 'quantity', 'unit_price', 'line_total']
-            if not all(k in col_map for k in required_cols_by_name):
-                logger.warning(f"Attempting positional fallback for table cols on page {page_idx+1}, table {df_table_index+1}. Headers: {df.iloc[0].tolist()}")
-                cols = df.columns # These are likely 0, 1, 2, ...
-                col_map.setdefault('product_code_raw', cols[0])
-                # Description is often cols[1] implicitly
-                col_map.setdefault('customs_code', cols[2] if len(cols) > 2 else None)
-                col_map.setdefault('unit_measure', cols[3] if len(cols) > 3 else None)
-                col_map.setdefault('quantity', cols[4] if len(cols) > 4 else None)
-                col_map.setdefault('unit_price', cols[5] if len(cols) > 5 else None)
-                col_map.setdefault('line_total', cols[6] if len(cols) > 6 else None)
-
-            if not all(k in col_map for k in required_cols_by_name):
-                msg = f"Skipping table {df_table_index+1} on page {page_idx+1} due to missing key column mappings after fallback. Mapped: {list(col_map.keys())}"
-                invoice_data["errors"].append(msg)
-                logger.warning(msg)
-                continue
-
-            # Process table rows, skipping the header row (df.iloc[0])
-            for i in range(1, len(df)):
-                row_data = df.iloc[i]
-
-                product_code_raw_val = str(row_data[col_map['product_code_raw']]).strip()
-
-                description_col_val = ""
-                # Assuming description is in the column immediately after product_code_raw if it exists
-                try:
-                    product_col_index = df.columns.get_loc(col_map['product_code_raw'])
-                    if product_col_index + 1 < len(df.columns):
-                        description_col_val = str(row_data[df.columns[product_col_index + 1]]).strip()
-                except KeyError: # product_code_raw column name not found in df.columns
-                     logger.warning(f"Column '{col_map['product_code_raw']}' for product code not found in table on page {page_idx+1}.")
-
+            # The column layout is the same on every page of this format, so a header row seen
+            # before reuses its resolved positions instead of being analysed again
+            header_cells = tuple(df.iloc[0].tolist())
+            col_pos = header_col_positions.get(header_cells)
+            if col_pos is None:
+                header_row_text = df.iloc[0].astype(str).str.lower().str.strip()
+                col_map = {}
+                for i, header_text in enumerate(header_row_text):
+                    col_name_df = df.columns[i] # Camelot might use 0, 1, 2.. or parsed names
+                    if "prodotto" in header_text: col_map['product_code_raw'] = col_name_df
+                    elif "voce dog" in header_text: col_map['customs_code'] = col_name_df
+                    elif header_text == "um": col_map['unit_measure'] = col_name_df
+                    elif "qtà fatt" in header_text: col_map['quantity'] = col_name_df
+                    elif "prezzo unitario" in header_text: col_map['unit_price'] = col_name_df
+                    elif "importo" in header_text: col_map['line_total'] = col_name_df
+
+                # Fallback to positional mapping if key headers are missing
+                # This invoice format should have consistent headers, but this adds a bit of resilience.
+                required_cols_by_name = ['product_code_raw', 'quantity', 'unit_price', 'line_total']
+                headers_matched = all(k in col_map for k in required_cols_by_name)
+                if not headers_matched:
+                    logger.warning(f"Attempting positional fallback for table cols on page {page_idx+1}, table {df_table_index+1}. Headers: {df.iloc[0].tolist()}")
+                    cols = df.columns # These are likely 0, 1, 2, ...
+                    col_map.setdefault('product_code_raw', cols[0])
+                    # Description is often cols[1] implicitly
+                    col_map.setdefault('customs_code', cols[2] if len(cols) > 2 else None)
+                    col_map.setdefault('unit_measure', cols[3] if len(cols) > 3 else None)
+                    col_map.setdefault('quantity', cols[4] if len(cols) > 4 else None)
+                    col_map.setdefault('unit_price', cols[5] if len(cols) > 5 else None)
+                    col_map.setdefault('line_total', cols[6] if len(cols) > 6 else None)
+
+                if not all(k in col_map for k in required_cols_by_name):
+                    msg = f"Skipping table {df_table_index+1} on page {page_idx+1} due to missing key column mappings after fallback. Mapped: {list(col_map.keys())}"
+                    invoice_data["errors"].append(msg)
+                    logger.warning(msg)
+                    continue
 
+                # Resolve mapped columns to integer positions once; unmapped (None) columns stay None
+                col_pos = {key: (df.columns.get_loc(col) if col is not None else None) for key, col in col_map.items()}
+                if headers_matched: # Positional guesses are re-derived (and logged) for each table
+                    header_col_positions[header_cells] = col_pos
+
+            product_i = col_pos['product_code_raw']
+            # Assuming description is in the column immediately after product_code_raw if it exists
+            description_i = product_i + 1 if product_i + 1 < len(df.columns) else None
+            customs_i = col_pos.get('customs_code')
+            unit_measure_i = col_pos.get('unit_measure')
+            quantity_i = col_pos['quantity']
+            unit_price_i = col_pos['unit_price']
+            line_total_i = col_pos['line_total']
+
+            # Process table rows as plain lists, skipping the header row
+            rows = df.values.tolist()
+            for i in range(1, len(rows)):
+                row = rows[i]
+
+                product_code_raw_val = str(row[product_i]).strip()
                 product_lines = product_code_raw_val.split('\n')
                 actual_product_code = product_lines[0].strip()
+                line_total_val_str = str(row[line_total_i]).strip() if line_total_i is not None else ""
 
-                description_parts = []
-                if description_col_val and description_col_val.lower() != 'nan':
-                    description_parts.append(description_col_val)
-
-                for line_part in product_lines[1:]: # Sub-lines in the product code cell
-                    lp = line_part.strip()
-                    if lp and lp.lower() != 'nan':
-                         description_parts.append(lp)
-
-                full_description = " | ".join(filter(None, description_parts)) # filter(None, ...) removes empty strings
-
-                line_total_val_str = str(row_data.get(col_map['line_total'], "")).strip()
                 # Skip if no actual product code or line total (likely empty row or sub-description already handled)
                 # Also skip rows that look like table footers (e.g., "Totale...")
+                # Checked before any other cell is read, since footer/continuation rows are common
                 if not actual_product_code or not line_total_val_str or actual_product_code.lower().startswith("total"):
                     continue
 
+                description_parts = []
+                if description_i is not None:
+                    description_parts.append(_norm(str(row[description_i])))
+                for line_part in product_lines[1:]: # Sub-lines in the product code cell
+                    description_parts.append(_norm(line_part))
+
+                full_description = " | ".join(filter(None, description_parts)) # filter(None, ...) drops empty/'nan' parts
+
                 line_item = {
                     "product_code": actual_product_code,
                     "description": full_description or None, # Ensure None if empty
-                    "customs_code": str(row_data.get(col_map.get('customs_code'), "")).strip() or None,
-                    "unit_measure": str(row_data.get(col_map.get('unit_measure'), "")).strip() or None,
-                    "quantity": parse_italian_decimal(str(row_data.get(col_map['quantity']))),
-                    "unit_price": parse_italian_decimal(str(row_data.get(col_map['unit_price']))),
+                    "customs_code": _norm(str(row[customs_i])) if customs_i is not None else None,
+                    "unit_measure": _norm(str(row[unit_measure_i])) if unit_measure_i is not None else None,
+                    "quantity": parse_italian_decimal(str(row[quantity_i]) if quantity_i is not None else None),
+                    "unit_price": parse_italian_decimal(str(row[unit_price_i]) if unit_price_i is not None else None),
                     "line_total": parse_italian_decimal(line_total_val_str)
                 }
 
-                # Clean up 'nan' strings that might have slipped through
-                for k_str_field in ["customs_code", "unit_measure"]:
-                    if line_item[k_str_field] and isinstance(line_item[k_str_field], str) and line_item[k_str_field].lower() == 'nan':
-                        line_item[k_str_field] = None
-
                 if line_item["line_total"] is not None:
-                    all_line_items_total += line_item["line_total"]
+                    line_totals.append(line_item["line_total"])
 
                 if current_section_info: # Check if a section is currently being built
                     current_section_info.setdefault("line_items", []).append(line_item)
@@ -367,30 +572,28 @@ def parse_invoice_specific(pdf_path):
     if current_section_info and current_section_info.get("line_items"):
         invoice_data["sections"].append(current_section_info)
 
+    all_line_items_total = sum(line_totals, Decimal('0.0'))
+
     # --- Enhanced extraction from filename and all pages ---
     # Try to extract data from filename first (as fallback)
     filename = invoice_data.get("file_name", "")
     if filename and not invoice_data["grand_total"]:
-        # Pattern: "15473.37 €"
-        filename_total_match = re.search(r"([\d\.,]+)\s*€", filename)
+        filename_total_match = _RE_FILENAME_TOTAL.search(filename)
         if filename_total_match:
             invoice_data["grand_total"] = parse_italian_decimal(filename_total_match.group(1))
     
     if filename and not invoice_data["total_packages"]:
-        # Pattern: "46 colli"
-        filename_packages_match = re.search(r"(\d+)\s*colli", filename)
+        filename_packages_match = _RE_FILENAME_PACKAGES.search(filename)
         if filename_packages_match:
             invoice_data["total_packages"] = int(filename_packages_match.group(1))
     
     if filename and not invoice_data["net_weight_kg"]:
-        # Pattern: "(297.50 Kg_N"
-        filename_net_match = re.search(r"\(([\d\.,]+)\s*Kg_N", filename)
+        filename_net_match = _RE_FILENAME_NET.search(filename)
         if filename_net_match:
             invoice_data["net_weight_kg"] = parse_italian_decimal(filename_net_match.group(1))
     
     if filename and not invoice_data["gross_weight_kg"]:
-        # Pattern: "328 Kg_B)"
-        filename_gross_match = re.search(r"([\d\.,]+)\s*Kg_B\)", filename)
+        filename_gross_match = _RE_FILENAME_GROSS.search(filename)
         if filename_gross_match:
             invoice_data["gross_weight_kg"] = parse_italian_decimal(filename_gross_match.group(1))
 
@@ -398,21 +601,13 @@ def parse_invoice_specific(pdf_path):
     footer_fields_found_count = 0
     for page_idx_footer in range(num_pages - 1, max(-1, num_pages - 3), -1): # Check last 2 pages (0-indexed)
         page_key = f"page{page_idx_footer+1}"
-        if page_key in invoice_data["raw_text_summary"]:
-            footer_text_source = invoice_data["raw_text_summary"][page_key]
+        if page_key in page_text_snippets:
+            footer_text_source = page_text_snippets[page_key]
 
             if not invoice_data["grand_total"]:
                 # Multiple patterns for total amount - updated for exact format
-                total_patterns = [
-                    r"Tot\s*importo:\s*\(\s*EUR\s*\)\s*([\d\.,]+)",  # Exact: "Tot importo: ( EUR ) 15.473,37"
-                    r"Tot(?:ale)?\s*importo:\s*\(\s*EUR\s*\)\s*([\d\.,]+)",
-                    r"Tot(?:ale)?\s*importo:\s*([\d\.,]+)",
-                    r"Totale:\s*([\d\.,]+)",
-                    r"TOTALE:\s*([\d\.,]+)",
-                    r"Total:\s*([\d\.,]+)"
-                ]
-                for pattern in total_patterns:
-                    match_total = re.search(pattern, footer_text_source, re.IGNORECASE)
+                for pattern in _RE_TOTAL_PATTERNS:
+                    match_total = pattern.search(footer_text_source)
                     if match_total:
                         invoice_data["grand_total"] = parse_italian_decimal(match_total.group(1))
                         if invoice_data["grand_total"] is not None: 
@@ -420,22 +615,15 @@ def parse_invoice_specific(pdf_path):
                         break
 
             if not invoice_data["shipping_terms"]:
-                match_porto = re.search(r"Porto:\s*(.*)", footer_text_source)
+                match_porto = _RE_PORTO.search(footer_text_source)
                 if match_porto:
                     invoice_data["shipping_terms"] = match_porto.group(1).strip()
                     if invoice_data["shipping_terms"]: footer_fields_found_count +=1
 
             if not invoice_data["total_packages"]:
                 # Multiple patterns for package count - updated for exact format
-                package_patterns = [
-                    r"Numero colli:\s*(\d+)",  # Exact: "Numero colli: 46"
-                    r"Numero\s*colli:\s*(\d+)",
-                    r"N\.\s*colli:\s*(\d+)",
-                    r"Colli:\s*(\d+)",
-                    r"(\d+)\s*colli"
-                ]
-                for pattern in package_patterns:
-                    match_colli = re.search(pattern, footer_text_source, re.IGNORECASE)
+                for pattern in _RE_PACKAGE_PATTERNS:
+                    match_colli = pattern.search(footer_text_source)
                     if match_colli:
                         try:
                             invoice_data["total_packages"] = int(match_colli.group(1))
@@ -446,15 +634,8 @@ def parse_invoice_specific(pdf_path):
 
             if not invoice_data["net_weight_kg"]:
                 # Multiple patterns for net weight - updated for exact format
-                net_weight_patterns = [
-                    r"Peso netto \( KG \):\s*([\d\.,]+)",  # Exact: "Peso netto ( KG ): 297,5"
-                    r"Peso\s*netto\s*\(\s*KG\s*\):\s*([\d\.,]+)",
-                    r"Peso\s*netto:\s*([\d\.,]+)",
-                    r"Net\s*weight:\s*([\d\.,]+)",
-                    r"([\d\.,]+)\s*Kg[_\s]*N"
-                ]
-                for pattern in net_weight_patterns:
-                    match_net = re.search(pattern, footer_text_source, re.IGNORECASE)
+                for pattern in _RE_NET_WEIGHT_PATTERNS:
+                    match_net = pattern.search(footer_text_source)
                     if match_net:
                         invoice_data["net_weight_kg"] = parse_italian_decimal(match_net.group(1))
                         if invoice_data["net_weight_kg"] is not None: 
@@ -463,15 +644,8 @@ def parse_invoice_specific(pdf_path):
 
             if not invoice_data["gross_weight_kg"]:
                 # Multiple patterns for gross weight - updated for exact format
-                gross_weight_patterns = [
-                    r"Peso lordo \( KG \):\s*([\d\.,]+)",  # Exact: "Peso lordo ( KG ): 328"
-                    r"Peso\s*lordo\s*\(\s*KG\s*\):\s*([\d\.,]+)",
-                    r"Peso\s*lordo:\s*([\d\.,]+)",
-                    r"Gross\s*weight:\s*([\d\.,]+)",
-                    r"([\d\.,]+)\s*Kg[_\s]*B"
-                ]
-                for pattern in gross_weight_patterns:
-                    match_gross = re.search(pattern, footer_text_source, re.IGNORECASE)
+                for pattern in _RE_GROSS_WEIGHT_PATTERNS:
+                    match_gross = pattern.search(footer_text_source)
                     if match_gross:
                         invoice_data["gross_weight_kg"] = parse_italian_decimal(match_gross.group(1))
                         if invoice_data["gross_weight_kg"] is not None: 
@@ -482,13 +656,17 @@ def parse_invoice_specific(pdf_path):
             if footer_fields_found_count >= 4: # Adjust if more/less critical footer fields
                 break
 
-    # Fallback search for grand_total across all page texts if not found in typical footer locations
+    # Fallback search for grand_total across all page texts if not found in typical footer locations.
+    # Best effort: only the stored per-page snippets are searched, page by page, stopping at the first match
     if not invoice_data["grand_total"]:
-        full_doc_text_for_total = "\n".join(text_snippet for text_snippet in invoice_data["raw_text_summary"].values() if text_snippet)
-        if full_doc_text_for_total:
-            match_total_fallback = re.search(r"Tot(?:ale)?\s*importo:\s*\(EUR\)\s*([\d\.,]+)", full_doc_text_for_total, re.IGNORECASE)
+        for text_snippet in page_text_snippets.values():
+            match_total_fallback = _RE_TOTAL_FALLBACK.search(text_snippet) if text_snippet else None
             if match_total_fallback:
                 invoice_data["grand_total"] = parse_italian_decimal(match_total_fallback.group(1))
+                break
+
+    if include_raw_text:
+        invoice_data["raw_text_summary"] = page_text_snippets
 
     # --- Validation ---
     invoice_data["calculated_grand_total"] = all_line_items_total # Already a Decimal
@@ -552,28 +730,155 @@ def convert_to_laravel_format(parsed_data):
 
     # No default "Unknown Product" if empty, Laravel should handle empty products list.
 
+    data = {
+        "bill": bill_data,
+        "delivery": delivery_data,
+        "products": products_data,
+        "extraction_method": "camelot+pdfminer",
+        "validation_checksum_ok": parsed_data.get("validation_checksum_ok", False),
+        "parsing_errors": parsed_data.get("errors", []) # Include parsing errors here
+    }
+    # Raw text summary is already snippets; only present when requested (?debug=1)
+    if parsed_data.get("raw_text_summary"):
+        data["raw_text"] = parsed_data["raw_text_summary"]
+
     return {
         "success": not bool(parsed_data.get("errors")), # Success if no major parsing errors (checksum is a warning)
-        "data": {
-            "bill": bill_data,
-            "delivery": delivery_data,
-            "products": products_data,
-            "extraction_method": "camelot+pdfminer",
-            # Raw text summary is already snippets
-            "raw_text": parsed_data.get("raw_text_summary", {}),
-            "validation_checksum_ok": parsed_data.get("validation_checksum_ok", False),
-            "parsing_errors": parsed_data.get("errors", []) # Include parsing errors here
-        },
+        "data": data,
         "message": "Invoice parsing attempted. Check 'success' and 'parsing_errors' fields."
     }
 
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    logger.warning(f"Rejected upload larger than {MAX_UPLOAD_MB} MB from {request.remote_addr}")
+    return jsonify({
+        'success': False, 'error': 'File too large',
+        'message': f'Uploads are limited to {MAX_UPLOAD_MB} MB in total.'
+    }), 413
+
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'service': 'invoice-pdf-parser', 'version': '1.1'})
 
+def parse_and_convert(pdf_path, include_raw_text=False):
+    """Parses one PDF and converts it to the Laravel format. Top-level so it can run in a worker process."""
+    return convert_to_laravel_format(parse_invoice_specific(pdf_path, include_raw_text=include_raw_text))
+
+def _get_parse_pool():
+    """
+    Creates the batch process pool on first use. Workers come from a forkserver rather than
+    being forked from this process, which is multi-threaded by then (threaded dev server,
+    the executor's own management thread), so they never inherit a lock held by another thread.
+    """
+    global _PARSE_POOL
+    with _PARSE_POOL_LOCK: # The dev server is threaded, so two batches can race here
+        if _PARSE_POOL is None:
+            _PARSE_POOL = ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                              mp_context=multiprocessing.get_context('forkserver'))
+        return _PARSE_POOL
+
+def _discard_parse_pool(pool):
+    """
+    Retires a pool after one of its jobs timed out: its queued jobs are cancelled and the
+    next batch gets a fresh pool, so one stuck PDF does not hold up later uploads. A job
+    already running finishes in the retired pool's worker and its result is dropped.
+    """
+    global _PARSE_POOL
+    with _PARSE_POOL_LOCK:
+        if _PARSE_POOL is pool:
+            _PARSE_POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _parse_batch(pdf_paths, filenames, include_raw_text=False):
+    """
+    Parses several PDFs in parallel worker processes (not threads: Ghostscript, used by
+    Camelot, is not thread-safe). Results keep upload order; a PDF that does not finish
+    within PARSE_BATCH_TIMEOUT seconds gets an error entry instead of stalling the batch,
+    and its pool is retired.
+    """
+    pool = _get_parse_pool()
+    futures = [pool.submit(parse_and_convert, pdf_path, include_raw_text) for pdf_path in pdf_paths]
+    done, _ = wait(futures, timeout=PARSE_BATCH_TIMEOUT)
+
+    if len(done) < len(futures):
+        # Cancelled here as well: the pool may be garbage-collected before its
+        # shutdown gets round to cancelling what is still queued
+        for future in futures:
+            future.cancel()
+        _discard_parse_pool(pool)
+
+    results = []
+    for filename, future in zip(filenames, futures):
+        if future not in done:
+            logger.warning(f"Parsing timed out for {filename} after {PARSE_BATCH_TIMEOUT}s")
+            result = {'success': False, 'error': 'Timeout',
+                      'message': f'Parsing did not finish within {PARSE_BATCH_TIMEOUT} seconds.'}
+        else:
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Error parsing {filename} in worker process: {e}", exc_info=True)
+                result = {'success': False, 'error': 'Internal Server Error: ' + str(e),
+                          'message': 'An unexpected error occurred during processing. Please check server logs.'}
+        results.append(result)
+    return results
+
+def _save_upload(file):
+    """
+    Streams an upload to its own temporary file in fixed-size chunks, hashing as it goes,
+    instead of reading it into memory whole. Returns (path, SHA-256 hex digest).
+    """
+    try:
+        return _write_upload(file.stream, _UPLOAD_DIR)
+    except OSError as e:
+        if _UPLOAD_DIR is None:
+            raise
+        # tmpfs is small in containers (64 MB /dev/shm by default) and batches land there at once
+        logger.warning(f"Could not write {file.filename} to {_UPLOAD_DIR} ({e}), using the default temp directory")
+        file.stream.seek(0)
+        return _write_upload(file.stream, None)
+
+def _write_upload(stream, directory):
+    """Copies stream to a new temporary PDF in directory; the partial file is removed on failure."""
+    fd, tmp_path = tempfile.mkstemp(suffix='.pdf', dir=directory)
+    hasher = hashlib.sha256()
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file_obj:
+            for chunk in iter(lambda: stream.read(_UPLOAD_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+                tmp_file_obj.write(chunk)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path, hasher.hexdigest()
+
+def _cache_get(digest):
+    """Returns the cached Laravel-format result for a PDF digest, or None."""
+    with _RESULT_CACHE_LOCK:
+        result = _RESULT_CACHE.get(digest)
+        if result is not None:
+            _RESULT_CACHE.move_to_end(digest)
+        return result
+
+def _cache_put(digest, result):
+    """Stores a Laravel-format result, evicting the least recently used entries beyond RESULT_CACHE_SIZE."""
+    if RESULT_CACHE_SIZE <= 0:
+        return
+    with _RESULT_CACHE_LOCK:
+        _RESULT_CACHE[digest] = result
+        _RESULT_CACHE.move_to_end(digest)
+        while len(_RESULT_CACHE) > RESULT_CACHE_SIZE:
+            _RESULT_CACHE.popitem(last=False)
+
 @app.route('/parse-invoice', methods=['POST'])
 def parse_invoice_route():
+    """
+    Parses one or more uploaded PDFs (all sent under the "file" key).
+    A single file returns its Laravel-format response as before; several files are
+    parsed in parallel worker processes and returned as {"success", "results": [...]}.
+    """
     logger.info(f"Received request to /parse-invoice from {request.remote_addr}")
+    tmp_paths = []
     try:
         if 'file' not in request.files:
             logger.warning("No 'file' part in the request.")
@@ -582,51 +887,80 @@ def parse_invoice_route():
                 'message': 'Please ensure the POST request includes a file with key "file".'
             }), 400
 
-        file = request.files['file']
-        if not file or file.filename == '':
-            logger.warning("No file selected for uploading.")
-            return jsonify({
-                'success': False, 'error': 'No file selected',
-                'message': 'Please select a PDF file to upload.'
-            }), 400
-
-        if not file.filename.lower().endswith('.pdf'):
-            logger.warning(f"Invalid file type: {file.filename}")
-            return jsonify({
-                'success': False, 'error': 'Invalid file type',
-                'message': 'Only PDF files are supported. Received: ' + file.filename
-            }), 400
-
-        logger.info(f"Processing uploaded file: {file.filename}")
+        files = request.files.getlist('file')
+        for file in files:
+            if not file or file.filename == '':
+                logger.warning("No file selected for uploading.")
+                return jsonify({
+                    'success': False, 'error': 'No file selected',
+                    'message': 'Please select a PDF file to upload.'
+                }), 400
+
+            if not file.filename.lower().endswith('.pdf'):
+                logger.warning(f"Invalid file type: {file.filename}")
+                return jsonify({
+                    'success': False, 'error': 'Invalid file type',
+                    'message': 'Only PDF files are supported. Received: ' + file.filename
+                }), 400
+
+        # Per-page raw text is only included for debugging (?debug=1)
+        include_raw_text = request.args.get('debug') == '1'
+
+        # Identical PDFs are answered from the content-addressed cache
+        filenames = [file.filename for file in files]
+        digests = []
+        results = []
+        to_parse = [] # Indices of uploads that missed the cache
+        parse_paths = []
+        for index, file in enumerate(files):
+            # Camelot needs a filesystem path, so each upload gets its own temporary file
+            tmp_path, digest = _save_upload(file)
+            tmp_paths.append(tmp_path)
+            if include_raw_text: # Debug responses carry extra data, so they are cached separately
+                digest += ':raw'
+            digests.append(digest)
+            cached = _cache_get(digest)
+            results.append(cached)
+            if cached is not None:
+                logger.info(f"Returning cached result for {file.filename} ({digest})")
+                continue
 
-        # Use 'with' for automatic closing and deletion of the temporary file
-        with tempfile.NamedTemporaryFile(delete=True, suffix='.pdf') as tmp_file_obj: # delete=True is default for NamedTemporaryFile
-            file.save(tmp_file_obj.name)
+            logger.info(f"Processing uploaded file: {file.filename}")
+            parse_paths.append(tmp_path)
+            to_parse.append(index)
 
-            # --- Core Parsing ---
-            # The file remains open while in this 'with' block.
-            # pdfminer and camelot should be able to read it.
-            # If they need exclusive access, we might need to close and reopen,
-            # but usually they handle file-like objects or paths.
-            # Forcing path for camelot:
-            pdf_path_for_parsing = tmp_file_obj.name
+        if not to_parse:
+            parsed = []
+        elif len(files) == 1:
+            # A single invoice is parsed in-process; the pool only pays off for batches
+            logger.info(f"Parsing PDF at temporary path: {parse_paths[0]}")
+            parsed = [parse_and_convert(parse_paths[0], include_raw_text)]
+        else:
+            parsed = _parse_batch(parse_paths, [filenames[index] for index in to_parse], include_raw_text)
 
-            logger.info(f"Parsing PDF at temporary path: {pdf_path_for_parsing}")
-            gemini_result = parse_invoice_specific(pdf_path_for_parsing)
-            logger.info(f"Initial parsing complete for {file.filename}")
+        for index, result in zip(to_parse, parsed):
+            results[index] = result
+            if 'error' not in result: # Timeouts and worker crashes are not cached
+                _cache_put(digests[index], result)
+        logger.info(f"Parsing and conversion to Laravel format complete for {', '.join(filenames)}")
 
-            # Convert to Laravel format
-            laravel_response = convert_to_laravel_format(gemini_result)
-            logger.info(f"Conversion to Laravel format complete for {file.filename}")
+        if len(files) == 1:
+            payload = results[0]
+        else:
+            payload = {
+                'success': all(result.get('success', False) for result in results),
+                'results': [dict(result, file_name=filename) for result, filename in zip(results, filenames)]
+            }
 
-            # Use the custom serializer for Decimals when creating the final JSON response
-            return app.response_class(
-                response=json.dumps(laravel_response, default=decimal_to_string_default),
-                status=200,
-                mimetype='application/json'
-            )
-        # Temporary file is automatically deleted when exiting the 'with' block
+        # convert_to_laravel_format already stringifies Decimals; the default= hook is only a safety net
+        return app.response_class(
+            response=to_json_bytes(payload),
+            status=200,
+            mimetype='application/json'
+        )
 
+    except HTTPException:
+        raise # e.g. the 413 for uploads over MAX_CONTENT_LENGTH, answered by its error handler
     except Exception as e:
         logger.error(f"Unhandled error in /parse-invoice endpoint: {e}", exc_info=True)
         # No need to log traceback.format_exc() separately if exc_info=True is used with logger.error
@@ -635,8 +969,16 @@ def parse_invoice_route():
             'error': 'Internal Server Error: ' + str(e),
             'message': 'An unexpected error occurred during processing. Please check server logs.'
         }), 500
+    finally:
+        for tmp_path in tmp_paths:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                logger.warning(f"Could not remove temporary file {tmp_path}")
 
 if __name__ == '__main__':
     # For local development. Use Gunicorn or similar in production.
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # The debugger and reloader slow every request; opt in with FLASK_DEBUG=1
+    debug = os.environ.get('FLASK_DEBUG', '0') == '1'
+    app.run(host='0.0.0.0', port=5000, debug=debug, use_reloader=debug, threaded=True)
             # tmp_file_obj.flush() # Ensure all data is written to disk before parsing
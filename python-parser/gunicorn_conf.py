@@ -0,0 +1,15 @@
+import multiprocessing
+import os
+
+# Gunicorn configuration for the invoice parser service.
+# PDF parsing is CPU-bound, so we use pre-forked sync workers rather than
+# threads or green threads: each worker parses one invoice at a time on its own core.
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+
+# Import app.py once in the master so ConfigManager.load_config() and the
+# InvoiceProcessor are built a single time and shared copy-on-write by workers.
+preload_app = True
@@ -2,9 +2,7 @@
 """
 Quick test to check product extraction without the error.
 """
-import sys
 import os
-sys.path.append('/Users/bogdancristianburci/Herd/InvoiceScan/python-parser')
 
 from src.invoice_processor import InvoiceProcessor
 from src.models.invoice_models import ProcessingConfig
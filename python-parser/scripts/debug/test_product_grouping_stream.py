@@ -2,9 +2,7 @@
 """
 Test script to verify product grouping per delivery functionality using stream extraction.
 """
-import sys
 import os
-sys.path.append('/Users/bogdancristianburci/Herd/InvoiceScan/python-parser')
 
 from src.invoice_processor import InvoiceProcessor
 from src.models.invoice_models import ProcessingConfig
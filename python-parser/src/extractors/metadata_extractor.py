@@ -3,7 +3,7 @@ import os
 import logging
 from typing import Optional
 from ..models.invoice_models import BillData
-from ..utils.pdf_utils import extract_text_from_page, get_pdf_page_count
+from ..utils.pdf_utils import PdfSource, describe_pdf_source, extract_page_text_fast, get_pdf_page_count
 from ..utils.helpers import parse_italian_decimal, extract_numeric_from_filename, format_address_lines
 
 logger = logging.getLogger(__name__)
@@ -15,27 +15,29 @@ class MetadataExtractor:
     def __init__(self):
         self.vendor_name = "MANIFATTURE DI SAN MARINO"  # Fixed for this invoice type
     
-    def extract_general_metadata(self, pdf_path: str) -> BillData:
+    def extract_general_metadata(self, pdf_path: PdfSource, page_count: Optional[int] = None) -> BillData:
         """
         Extract general bill/invoice metadata from the PDF.
         This focuses on header information that appears on page 1.
+        Pass page_count when it is already known to skip re-reading the page tree.
         """
         bill_data = BillData()
         bill_data.customer_address = None
         
-        # Set filename for potential fallback extraction
-        filename = os.path.basename(pdf_path)
+        # Set filename for potential fallback extraction (only available for paths)
+        filename = os.path.basename(pdf_path) if isinstance(pdf_path, str) else None
         
         # Verify PDF is readable
-        page_count = get_pdf_page_count(pdf_path)
+        if page_count is None:
+            page_count = get_pdf_page_count(pdf_path)
         if page_count == 0:
-            logger.error(f"Cannot read PDF for metadata extraction: {pdf_path}")
+            logger.error(f"Cannot read PDF for metadata extraction: {describe_pdf_source(pdf_path)}")
             return bill_data
         
         # Extract text from first page for header information
-        page1_text = extract_text_from_page(pdf_path, 0)
+        page1_text = extract_page_text_fast(pdf_path, 0)
         if not page1_text:
-            logger.warning(f"Could not extract text from page 1 of {pdf_path}")
+            logger.warning(f"Could not extract text from page 1 of {describe_pdf_source(pdf_path)}")
             # Try filename extraction as fallback
             return self._extract_from_filename(filename, bill_data)
         
@@ -1,3 +1,4 @@
+import re
 import logging
 from typing import List, Dict, Any, Optional
 from decimal import Decimal
@@ -9,6 +10,39 @@ from ..utils.helpers import parse_italian_decimal
 
 logger = logging.getLogger(__name__)
 
+# Cross-page continuation lines, e.g. "MMM25.291160436.70 / MS5CE0002 1225" followed by "Tessuto: ..."
+_MODEL_ORDER_RES = (
+    re.compile(r"([A-Z0-9.]+)\s*/\s*([A-Z0-9]{9})\s+(\d+)"),  # With / separator
+    re.compile(r"([A-Z0-9.]+)\s+([A-Z0-9]{9})\s+(\d+)"),      # Without / separator
+    re.compile(r"([A-Z0-9.]+)\s*/\s*([A-Z0-9]+)\s+(\d+)")     # With / and flexible order series length
+)
+_PROPERTIES_RE = re.compile(r"Tessuto:\s*([^\n]+)")
+_PRODUCT_NAME_RE = re.compile(r"Tessuto:[^\n]+\n\s*([A-Z]+)\n\s*([A-Z]+)")
+
+# Footer fields, tried in order on the last pages
+_FOOTER_TOTAL_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r"Tot\s*importo:\s*\(\s*EUR\s*\)\s*([\d\.,]+)",
+    r"Tot(?:ale)?\s*importo:\s*\(\s*EUR\s*\)\s*([\d\.,]+)",
+    r"Tot(?:ale)?\s*importo:\s*([\d\.,]+)",
+    r"Totale:\s*([\d\.,]+)"
+))
+_FOOTER_SHIPPING_RE = re.compile(r"Porto:\s*(.*)")
+_FOOTER_PACKAGES_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r"Numero colli:\s*(\d+)",
+    r"N\.\s*colli:\s*(\d+)",
+    r"Colli:\s*(\d+)"
+))
+_FOOTER_NET_WEIGHT_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r"Peso netto \( KG \):\s*([\d\.,]+)",
+    r"Peso\s*netto\s*\(\s*KG\s*\):\s*([\d\.,]+)",
+    r"Peso\s*netto:\s*([\d\.,]+)"
+))
+_FOOTER_GROSS_WEIGHT_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r"Peso lordo \( KG \):\s*([\d\.,]+)",
+    r"Peso\s*lordo\s*\(\s*KG\s*\):\s*([\d\.,]+)",
+    r"Peso\s*lordo:\s*([\d\.,]+)"
+))
+
 
 class ResponseCompiler:
     """Compiles final response from all extraction and validation results."""
@@ -124,8 +158,6 @@ class ResponseCompiler:
         Handle cross-page delivery data by merging incomplete delivery records and
         extracting missing product details from subsequent pages.
         """
-        import re
-        
         # Find deliveries with incomplete data (missing model_number or product details)
         incomplete_deliveries = []
         complete_deliveries = []
@@ -197,8 +229,6 @@ class ResponseCompiler:
         Extract missing delivery data from a page's raw text.
         Looks for product details that appear early in the page (likely continuation from previous page).
         """
-        import re
-        
         if not page_text:
             return None
         
@@ -209,14 +239,8 @@ class ResponseCompiler:
         completion_data = {}
         
         # Extract model_number, order_series, and order_number from line like "MMM25.291160436.70 / MS5CE0002 1225"
-        model_order_patterns = [
-            r"([A-Z0-9.]+)\s*/\s*([A-Z0-9]{9})\s+(\d+)",  # With / separator
-            r"([A-Z0-9.]+)\s+([A-Z0-9]{9})\s+(\d+)",      # Without / separator
-            r"([A-Z0-9.]+)\s*/\s*([A-Z0-9]+)\s+(\d+)"     # With / and flexible order series length
-        ]
-        
-        for pattern in model_order_patterns:
-            model_order_match = re.search(pattern, search_text)
+        for pattern in _MODEL_ORDER_RES:
+            model_order_match = pattern.search(search_text)
             if model_order_match:
                 completion_data['model_number'] = model_order_match.group(1).strip()
                 completion_data['order_series'] = model_order_match.group(2).strip()
@@ -225,14 +249,14 @@ class ResponseCompiler:
                 break
         
         # Extract product_properties from line like "Tessuto: 100% Cotone"
-        properties_match = re.search(r"Tessuto:\s*([^\n]+)", search_text)
+        properties_match = _PROPERTIES_RE.search(search_text)
         if properties_match:
             completion_data['product_properties'] = properties_match.group(1).strip()
             logger.debug(f"Found properties completion: {completion_data['product_properties']}")
         
         # Extract product_name and model_name
         # Look for pattern: properties line, then product_name line, then model_name line
-        product_name_match = re.search(r"Tessuto:[^\n]+\n\s*([A-Z]+)\n\s*([A-Z]+)", search_text)
+        product_name_match = _PRODUCT_NAME_RE.search(search_text)
         if product_name_match:
             completion_data['product_name'] = product_name_match.group(1).strip()
             completion_data['model_name'] = product_name_match.group(2).strip()
@@ -337,17 +361,8 @@ class ResponseCompiler:
             
             # Extract total amount if not already found
             if not result.bill_data.total_amount:
-                total_patterns = [
-                    r"Tot\s*importo:\s*\(\s*EUR\s*\)\s*([\d\.,]+)",
-                    r"Tot(?:ale)?\s*importo:\s*\(\s*EUR\s*\)\s*([\d\.,]+)",
-                    r"Tot(?:ale)?\s*importo:\s*([\d\.,]+)",
-                    r"Totale:\s*([\d\.,]+)",
-                    r"TOTALE:\s*([\d\.,]+)"
-                ]
-                
-                for pattern in total_patterns:
-                    import re
-                    match = re.search(pattern, footer_text, re.IGNORECASE)
+                for pattern in _FOOTER_TOTAL_RES:
+                    match = pattern.search(footer_text)
                     if match:
                         total_amount = parse_italian_decimal(match.group(1))
                         if total_amount:
@@ -356,22 +371,14 @@ class ResponseCompiler:
             
             # Extract shipping terms
             if not result.bill_data.shipping_term:
-                import re
-                match = re.search(r"Porto:\s*(.*)", footer_text)
+                match = _FOOTER_SHIPPING_RE.search(footer_text)
                 if match:
                     result.bill_data.shipping_term = match.group(1).strip()
             
             # Extract package count
             if not result.bill_data.package_count:
-                package_patterns = [
-                    r"Numero colli:\s*(\d+)",
-                    r"N\.\s*colli:\s*(\d+)",
-                    r"Colli:\s*(\d+)"
-                ]
-                
-                for pattern in package_patterns:
-                    import re
-                    match = re.search(pattern, footer_text, re.IGNORECASE)
+                for pattern in _FOOTER_PACKAGES_RES:
+                    match = pattern.search(footer_text)
                     if match:
                         try:
                             result.bill_data.package_count = int(match.group(1))
@@ -381,15 +388,8 @@ class ResponseCompiler:
             
             # Extract weights
             if not result.bill_data.net_weight_kg:
-                net_patterns = [
-                    r"Peso netto \( KG \):\s*([\d\.,]+)",
-                    r"Peso\s*netto\s*\(\s*KG\s*\):\s*([\d\.,]+)",
-                    r"Peso\s*netto:\s*([\d\.,]+)"
-                ]
-                
-                for pattern in net_patterns:
-                    import re
-                    match = re.search(pattern, footer_text, re.IGNORECASE)
+                for pattern in _FOOTER_NET_WEIGHT_RES:
+                    match = pattern.search(footer_text)
                     if match:
                         net_weight = parse_italian_decimal(match.group(1))
                         if net_weight:
@@ -397,15 +397,8 @@ class ResponseCompiler:
                             break
             
             if not result.bill_data.gross_weight_kg:
-                gross_patterns = [
-                    r"Peso lordo \( KG \):\s*([\d\.,]+)",
-                    r"Peso\s*lordo\s*\(\s*KG\s*\):\s*([\d\.,]+)",
-                    r"Peso\s*lordo:\s*([\d\.,]+)"
-                ]
-                
-                for pattern in gross_patterns:
-                    import re
-                    match = re.search(pattern, footer_text, re.IGNORECASE)
+                for pattern in _FOOTER_GROSS_WEIGHT_RES:
+                    match = pattern.search(footer_text)
                     if match:
                         gross_weight = parse_italian_decimal(match.group(1))
                         if gross_weight:
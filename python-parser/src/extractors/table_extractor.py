@@ -1,20 +1,53 @@
 import re
 import os
 import logging
+from bisect import bisect_right
 import camelot
 from typing import List, Optional, Dict, Any
 from ..models.invoice_models import PageData, ProductData, DeliveryData, ProcessingConfig
 from ..utils.pdf_utils import extract_text_from_page
-from ..utils.helpers import parse_italian_decimal, clean_string_field
+from ..utils.helpers import parse_italian_decimal, cached_regex
 
 logger = logging.getLogger(__name__)
 
+# Product codes in table cells start with two or more capital letters
+_PRODUCT_CODE_START_RE = re.compile(r'[A-Z]{2,}')
+
+# Line-by-line patterns for the text-based fallback extraction
+_MMA_PRODUCT_CODE_RE = re.compile(r'^MMA\d+\.\d+\.\d+')
+_ITALIAN_NUMBER_LINE_RE = re.compile(r'^\d+[.,]\d+$')
+
+# Units of measure that identify the UM cell of a product row
+_UNIT_OF_MEASURE_RE = re.compile(r'MT|KG|PZ|NR|KM')
+
+# Description lines for this invoice format, e.g. "Interno adesivo - Rinforzo colli",
+# which appear near product codes
+_DESCRIPTION_LINE_RE = re.compile(
+    r'Interno adesivo|Filo per impunture|Etichetta a nr|Particolare per confezione|Sigillo'
+    r'|Tessuto|Bottone|Materiale da imballo|Passamaneria',
+    re.IGNORECASE
+)
+
 
 class TableExtractor:
     """Extracts table data from individual PDF pages."""
     
     def __init__(self, config: ProcessingConfig):
         self.config = config
+        self._camelot_params = self._build_camelot_params()
+    
+    def _build_camelot_params(self) -> Dict[str, Any]:
+        """Build the page-independent Camelot parameters once from the configuration."""
+        camelot_params = {
+            'flavor': self.config.table_extraction_flavor,
+            'suppress_stdout': True
+        }
+        
+        # Only add line_scale for lattice flavor
+        if self.config.table_extraction_flavor == 'lattice':
+            camelot_params['line_scale'] = self.config.line_scale
+        
+        return camelot_params
     
     def extract_page_data(self, pdf_path: str, page_number: int) -> PageData:
         """
@@ -61,7 +94,8 @@ class TableExtractor:
             return None
         
         # Debug: log the page text to see what we're working with
-        logger.debug(f"Page text for delivery extraction (first 500 chars): {page_text[:500]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Page text for delivery extraction (first 500 chars): %s", page_text[:500])
         
         # Look for delivery data section start - try multiple patterns
         delivery_markers = [
@@ -74,7 +108,7 @@ class TableExtractor:
         found_marker = None
         for marker in delivery_markers:
             if marker in page_text:
-                logger.debug(f"Found delivery section marker: '{marker}'")
+                logger.debug("Found delivery section marker: '%s'", marker)
                 marker_found = True
                 found_marker = marker
                 break
@@ -83,7 +117,7 @@ class TableExtractor:
             logger.debug("No delivery section marker found in page text")
             return None
         
-        logger.debug(f"Found delivery section marker '{found_marker}', proceeding with extraction")
+        logger.debug("Found delivery section marker '%s', proceeding with extraction", found_marker)
         
         delivery_data = DeliveryData()
         
@@ -101,7 +135,7 @@ class TableExtractor:
             if ddt_match:
                 delivery_data.ddt_series = ddt_match.group(1).strip()
                 delivery_data.ddt_number = ddt_match.group(2).strip()
-                logger.debug(f"Found DDT series: {delivery_data.ddt_series}, number: {delivery_data.ddt_number} using pattern: {pattern}")
+                logger.debug("Found DDT series: %s, number: %s using pattern: %s", delivery_data.ddt_series, delivery_data.ddt_number, pattern)
                 ddt_found = True
                 break
         
@@ -110,13 +144,13 @@ class TableExtractor:
             # Let's log all potential DDT-like patterns we can find for debugging
             all_ddt_matches = re.findall(r"([A-Z0-9]{5,12})\s+(\d+)", page_text)
             if all_ddt_matches:
-                logger.debug(f"Found potential DDT patterns that didn't match: {all_ddt_matches[:5]}")  # Show first 5
+                logger.debug("Found potential DDT patterns that didn't match: %s", all_ddt_matches[:5])  # Show first 5
         
         # Extract ddt_date from line like "Del: 19-05-2025"
         date_match = re.search(r"Del:\s*(\d{2}-\d{2}-\d{4})", page_text)
         if date_match:
             delivery_data.ddt_date = date_match.group(1).strip()
-            logger.debug(f"Found DDT date: {delivery_data.ddt_date}")
+            logger.debug("Found DDT date: %s", delivery_data.ddt_date)
         else:
             logger.debug("DDT date pattern not found")
         
@@ -124,7 +158,7 @@ class TableExtractor:
         reason_match = re.search(r"Causale\s*\n\s*([A-Z]{3})", page_text)
         if reason_match:
             delivery_data.ddt_reason = reason_match.group(1).strip()
-            logger.debug(f"Found DDT reason: {delivery_data.ddt_reason}")
+            logger.debug("Found DDT reason: %s", delivery_data.ddt_reason)
         else:
             logger.debug("DDT reason pattern not found")
         
@@ -143,7 +177,7 @@ class TableExtractor:
                 delivery_data.model_number = model_order_match.group(1).strip()
                 delivery_data.order_series = model_order_match.group(2).strip()
                 delivery_data.order_number = model_order_match.group(3).strip()
-                logger.debug(f"Found model number: {delivery_data.model_number}, order series: {delivery_data.order_series}, order number: {delivery_data.order_number}")
+                logger.debug("Found model number: %s, order series: %s, order number: %s", delivery_data.model_number, delivery_data.order_series, delivery_data.order_number)
                 model_order_found = True
                 break
         
@@ -154,7 +188,7 @@ class TableExtractor:
         properties_match = re.search(r"Tessuto:\s*([^\n]+)", page_text)
         if properties_match:
             delivery_data.product_properties = properties_match.group(1).strip()
-            logger.debug(f"Found product properties: {delivery_data.product_properties}")
+            logger.debug("Found product properties: %s", delivery_data.product_properties)
         else:
             logger.debug("Product properties pattern not found")
         
@@ -164,12 +198,12 @@ class TableExtractor:
         if product_name_match:
             delivery_data.product_name = product_name_match.group(1).strip()
             delivery_data.model_name = product_name_match.group(2).strip()
-            logger.debug(f"Found product name: {delivery_data.product_name}, model name: {delivery_data.model_name}")
+            logger.debug("Found product name: %s, model name: %s", delivery_data.product_name, delivery_data.model_name)
         else:
             logger.debug("Product name/model name pattern not found")
         
         # Log the final delivery data state
-        logger.debug(f"Final delivery data - DDT series: {delivery_data.ddt_series}, DDT number: {delivery_data.ddt_number}")
+        logger.debug("Final delivery data - DDT series: %s, DDT number: %s", delivery_data.ddt_series, delivery_data.ddt_number)
         
         # Only return delivery data if we found the essential fields
         if delivery_data.ddt_series and delivery_data.ddt_number:
@@ -205,7 +239,7 @@ class TableExtractor:
                 position = match.start()
                 found_ddts.append((ddt_series, ddt_number, position))
         
-        logger.debug(f"Found {len(found_ddts)} DDT patterns after 'DDT interno': {found_ddts}")
+        logger.debug("Found %s DDT patterns after 'DDT interno': %s", len(found_ddts), found_ddts)
         
         # For each DDT pattern found, try to extract delivery data from surrounding text
         for ddt_series, ddt_number, position in found_ddts:
@@ -218,9 +252,9 @@ class TableExtractor:
             delivery = self._extract_delivery_from_context(surrounding_text, ddt_series, ddt_number, position - start_pos)
             if delivery:
                 deliveries.append(delivery)
-                logger.debug(f"Successfully extracted delivery: {ddt_series} {ddt_number}")
+                logger.debug("Successfully extracted delivery: %s %s", ddt_series, ddt_number)
             else:
-                logger.debug(f"Failed to extract complete delivery data for: {ddt_series} {ddt_number}")
+                logger.debug("Failed to extract complete delivery data for: %s %s", ddt_series, ddt_number)
         
         # Remove duplicates based on DDT series and number
         unique_deliveries = []
@@ -267,7 +301,7 @@ class TableExtractor:
                 delivery_data.model_number = model_order_match.group(1).strip()
                 delivery_data.order_series = model_order_match.group(2).strip()
                 delivery_data.order_number = model_order_match.group(3).strip()
-                logger.debug(f"Found model/order for {ddt_number}: {delivery_data.model_number}, {delivery_data.order_series}, {delivery_data.order_number}")
+                logger.debug("Found model/order for %s: %s, %s, %s", ddt_number, delivery_data.model_number, delivery_data.order_series, delivery_data.order_number)
                 break
         
         # Extract product_properties from line like "Tessuto: 100% Cotone" - also only after DDT
@@ -282,7 +316,7 @@ class TableExtractor:
             delivery_data.model_name = product_name_match.group(2).strip()
         
         # Log what we found for this delivery
-        logger.debug(f"Delivery {ddt_number} extracted - model: {delivery_data.model_number or 'None'}, product: {delivery_data.product_name or 'None'}")
+        logger.debug("Delivery %s extracted - model: %s, product: %s", ddt_number, delivery_data.model_number or 'None', delivery_data.product_name or 'None')
         
         # Return delivery data even if some fields are missing
         # The essential requirement is just DDT series and number (which we already have)
@@ -292,29 +326,20 @@ class TableExtractor:
         """Extract tables using Camelot. page_number is 1-indexed."""
         
         try:
-            # Build parameters based on flavor
-            camelot_params = {
-                'pages': str(page_number_1_indexed),
-                'flavor': self.config.table_extraction_flavor,
-                'suppress_stdout': True
-            }
-            
-            # Only add line_scale for lattice flavor
-            if self.config.table_extraction_flavor == 'lattice':
-                camelot_params['line_scale'] = self.config.line_scale
-            
-            tables = camelot.read_pdf(pdf_path, **camelot_params)
+            # One Camelot pass per page; the tables it returns are reused for all row processing
+            tables = camelot.read_pdf(pdf_path, pages=str(page_number_1_indexed), **self._camelot_params)
             
             logger.info(f"Camelot: Page {page_number_1_indexed} - Found {tables.n} tables in '{os.path.basename(pdf_path)}'")
             
             # DEBUG: Log table details
-            for i, table in enumerate(tables):
-                df = table.df
-                logger.debug(f"Table {i+1}: {df.shape[0]} rows x {df.shape[1]} cols")
-                if not df.empty:
-                    logger.debug(f"Table {i+1} headers: {df.iloc[0].tolist()}")
-                    if len(df) > 1:
-                        logger.debug(f"Table {i+1} sample row: {df.iloc[1].tolist()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                for i, table in enumerate(tables):
+                    df = table.df
+                    logger.debug("Table %s: %s rows x %s cols", i+1, df.shape[0], df.shape[1])
+                    if not df.empty:
+                        logger.debug("Table %s headers: %s", i+1, df.iloc[0].tolist())
+                        if len(df) > 1:
+                            logger.debug("Table %s sample row: %s", i+1, df.iloc[1].tolist())
             
             return [table.df for table in tables]
             
@@ -327,24 +352,25 @@ class TableExtractor:
         
         products = []
         
-        logger.debug(f"Processing {len(tables)} tables on page {page_number + 1}")
+        logger.debug("Processing %s tables on page %s", len(tables), page_number + 1)
         
         for table_index, df in enumerate(tables):
-            logger.debug(f"Table {table_index + 1}: {df.shape[0]} rows x {df.shape[1]} cols")
+            logger.debug("Table %s: %s rows x %s cols", table_index + 1, df.shape[0], df.shape[1])
             
             if df.empty:
-                logger.debug(f"Skipping empty table {table_index + 1} on page {page_number + 1}")
+                logger.debug("Skipping empty table %s on page %s", table_index + 1, page_number + 1)
                 continue
             
             # For debugging: log table content
-            if len(df) > 0:
-                logger.debug(f"Table {table_index + 1} first row: {df.iloc[0].tolist()}")
-            if len(df) > 1:
-                logger.debug(f"Table {table_index + 1} second row: {df.iloc[1].tolist()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                if len(df) > 0:
+                    logger.debug("Table %s first row: %s", table_index + 1, df.iloc[0].tolist())
+                if len(df) > 1:
+                    logger.debug("Table %s second row: %s", table_index + 1, df.iloc[1].tolist())
             
             # Map column headers to our expected fields
             col_map = self._map_table_columns(df)
-            logger.debug(f"Table {table_index + 1} column mapping: {col_map}")
+            logger.debug("Table %s column mapping: %s", table_index + 1, col_map)
             
             # Try to extract products even if not all required columns are present
             # This is more flexible for different table structures
@@ -393,85 +419,6 @@ class TableExtractor:
         
         return col_map
     
-    def _validate_required_columns(self, col_map: Dict[str, str], table_index: int, page_number: int) -> bool:
-        """Validate that required columns are mapped."""
-        
-        required_cols = ['product_code_raw', 'quantity', 'unit_price', 'line_total']
-        missing_cols = [col for col in required_cols if col not in col_map or col_map[col] is None]
-        
-        if missing_cols:
-            logger.warning(f"Skipping table {table_index + 1} on page {page_number + 1} due to missing columns: {missing_cols}")
-            return False
-        
-        return True
-    
-    def _extract_product_from_row(self, df, row_index: int, col_map: Dict[str, str]) -> Optional[ProductData]:
-        """Extract a ProductData object from a table row."""
-        
-        try:
-            row_data = df.iloc[row_index]
-            
-            # Extract and clean product code
-            product_code_raw_val = str(row_data[col_map['product_code_raw']]).strip()
-            product_lines = product_code_raw_val.split('\n')
-            actual_product_code = product_lines[0].strip()
-            
-            # Skip if no actual product code or looks like footer
-            if not actual_product_code or actual_product_code.lower().startswith("total"):
-                return None
-            
-            # Extract line total and skip if empty
-            line_total_val_str = str(row_data.get(col_map['line_total'], "")).strip()
-            if not line_total_val_str or line_total_val_str.lower() == 'nan':
-                return None
-            
-            # Build description from multiple sources
-            description = self._build_product_description(df, row_data, row_index, col_map, product_lines)
-            
-            # Create ProductData object
-            product = ProductData()
-            product.product_code = actual_product_code
-            product.description = description
-            product.customs_code = clean_string_field(str(row_data.get(col_map.get('customs_code'), "")))
-            product.unit_of_measure = clean_string_field(str(row_data.get(col_map.get('unit_measure'), "")))
-            
-            # Parse numeric fields
-            product.quantity = self._parse_numeric_field(row_data.get(col_map['quantity']))
-            product.unit_price = self._parse_numeric_field(row_data.get(col_map['unit_price']))
-            product.total_price = self._parse_numeric_field(line_total_val_str)
-            
-            return product
-            
-        except Exception as e:
-            logger.warning(f"Error extracting product from row {row_index}: {e}")
-            return None
-    
-    def _build_product_description(self, df, row_data, row_index: int, col_map: Dict[str, str], product_lines: List[str]) -> Optional[str]:
-        """Build comprehensive product description from multiple sources."""
-        
-        description_parts = []
-        
-        # Get description from dedicated column if it exists
-        try:
-            product_col_index = df.columns.get_loc(col_map['product_code_raw'])
-            if product_col_index + 1 < len(df.columns):
-                description_col_val = str(row_data[df.columns[product_col_index + 1]]).strip()
-                if description_col_val and description_col_val.lower() != 'nan':
-                    description_parts.append(description_col_val)
-        except (KeyError, IndexError):
-            pass
-        
-        # Add sub-lines from product code cell
-        for line_part in product_lines[1:]:
-            lp = line_part.strip()
-            if lp and lp.lower() != 'nan':
-                description_parts.append(lp)
-        
-        if description_parts:
-            return " | ".join(filter(None, description_parts))
-        
-        return None
-    
     def _parse_numeric_field(self, value) -> Optional[str]:
         """Parse and validate numeric fields, return as string for consistency."""
         
@@ -497,23 +444,29 @@ class TableExtractor:
         if len(page_data.all_deliveries) == 1:
             # Simple case: only one delivery, associate all products with it
             page_data.all_deliveries[0].products = page_data.products[:]
-            logger.debug(f"Single delivery found - associating all {len(page_data.products)} products with delivery {page_data.all_deliveries[0].ddt_number}")
+            logger.debug("Single delivery found - associating all %s products with delivery %s", len(page_data.products), page_data.all_deliveries[0].ddt_number)
             return
         
         # Complex case: multiple deliveries, need to determine which products belong to which delivery
         delivery_positions = self._find_delivery_positions_in_text(page_data.raw_text, page_data.all_deliveries)
         product_positions = self._find_product_positions_in_text(page_data.raw_text, page_data.products)
         
+        # Sort deliveries by position once so each product is a binary search, not a full scan.
+        # On equal positions the earlier delivery must win, so it is placed last among its ties.
+        order = sorted(range(len(delivery_positions)), key=lambda i: (delivery_positions[i], -i))
+        sorted_positions = [delivery_positions[i] for i in order]
+        sorted_deliveries = [page_data.all_deliveries[i] for i in order]
+        
         # Associate each product with the delivery that appears before it
         for product, product_pos in zip(page_data.products, product_positions):
-            best_delivery = self._find_closest_preceding_delivery(product_pos, delivery_positions, page_data.all_deliveries)
+            best_delivery = self._find_closest_preceding_delivery(product_pos, sorted_positions, sorted_deliveries)
             if best_delivery:
                 best_delivery.products.append(product)
-                logger.debug(f"Associated product {product.product_code} with delivery {best_delivery.ddt_number}")
+                logger.debug("Associated product %s with delivery %s", product.product_code, best_delivery.ddt_number)
             else:
                 # Fallback: associate with first delivery
                 page_data.all_deliveries[0].products.append(product)
-                logger.debug(f"Fallback: Associated product {product.product_code} with first delivery {page_data.all_deliveries[0].ddt_number}")
+                logger.debug("Fallback: Associated product %s with first delivery %s", product.product_code, page_data.all_deliveries[0].ddt_number)
         
         # Log final association summary
         for delivery in page_data.all_deliveries:
@@ -526,13 +479,13 @@ class TableExtractor:
         for delivery in deliveries:
             # Look for the DDT pattern in the text
             ddt_pattern = f"{delivery.ddt_series}\\s+{delivery.ddt_number}"
-            match = re.search(ddt_pattern, page_text)
+            match = cached_regex(ddt_pattern).search(page_text)
             if match:
                 positions.append(match.start())
             else:
                 # Fallback: try to find just the DDT number
                 number_pattern = f"\\b{delivery.ddt_number}\\b"
-                match = re.search(number_pattern, page_text)
+                match = cached_regex(number_pattern).search(page_text)
                 if match:
                     positions.append(match.start())
                 else:
@@ -547,33 +500,26 @@ class TableExtractor:
         positions = []
         
         for product in products:
-            # Look for the product code in the text
-            # Escape special regex characters in product code
-            escaped_code = re.escape(product.product_code)
-            match = re.search(escaped_code, page_text)
-            if match:
-                positions.append(match.start())
+            # Look for the product code in the text (a literal match, so no regex needed)
+            position = page_text.find(product.product_code)
+            if position != -1:
+                positions.append(position)
             else:
                 # Fallback: use a large position so it gets associated with the last delivery
                 positions.append(len(page_text))
-                logger.debug(f"Could not find position for product {product.product_code} in text - using fallback position")
+                logger.debug("Could not find position for product %s in text - using fallback position", product.product_code)
         
         return positions
     
     def _find_closest_preceding_delivery(self, product_position: int, delivery_positions: List[int], deliveries: List[DeliveryData]) -> Optional[DeliveryData]:
-        """Find the delivery that appears closest before the given product position."""
-        
-        best_delivery = None
-        best_distance = float('inf')
-        
-        for i, delivery_pos in enumerate(delivery_positions):
-            if delivery_pos <= product_position:  # Delivery must appear before or at the product
-                distance = product_position - delivery_pos
-                if distance < best_distance:
-                    best_distance = distance
-                    best_delivery = deliveries[i]
+        """
+        Find the delivery that appears closest before the given product position.
+        delivery_positions must be sorted ascending, with deliveries in the same order.
+        """
         
-        return best_delivery
+        # Delivery must appear before or at the product
+        index = bisect_right(delivery_positions, product_position)
+        return deliveries[index - 1] if index > 0 else None
     
     def _extract_products_from_table(self, df, table_index: int, page_number: int, col_map: Dict[str, str]) -> List[ProductData]:
         """Extract products from a table using flexible column mapping."""
@@ -582,28 +528,30 @@ class TableExtractor:
         
         # Skip if table is too small or has no meaningful data
         if len(df) < 2:
-            logger.debug(f"Table {table_index + 1} has insufficient rows for product extraction")
+            logger.debug("Table %s has insufficient rows for product extraction", table_index + 1)
             return products
         
         # Look for product-like patterns in any column that might contain product codes
         # This is more flexible than requiring specific column headers
-        for row_index in range(1, len(df)):  # Skip header row
+        # Iterate plain Python rows; building a pandas Series per row via iloc dominated this loop
+        rows = df.values.tolist()
+        for row_index in range(1, len(rows)):  # Skip header row
             try:
-                row_data = df.iloc[row_index]
+                row_data = rows[row_index]
+                # Stringify each cell once; the scans below all work on the stripped text
+                cell_strs = [str(cell_value).strip() for cell_value in row_data]
                 
                 # Look for product codes in any column - they typically start with letters and contain numbers
                 product_code = None
                 product_code_column = None
                 
-                for col_idx, cell_value in enumerate(row_data):
-                    cell_str = str(cell_value).strip()
-                    
+                for col_idx, cell_str in enumerate(cell_strs):
                     # Look for patterns that look like product codes
                     if (cell_str and 
                         len(cell_str) > 3 and 
                         cell_str.lower() != 'nan' and 
                         not cell_str.lower().startswith('total') and
-                        re.match(r'^[A-Z]{2,}', cell_str)):  # Starts with 2+ letters
+                        _PRODUCT_CODE_START_RE.match(cell_str)):  # Starts with 2+ letters
                         
                         product_code = cell_str.split('\n')[0].strip()  # Take first line if multi-line
                         product_code_column = col_idx
@@ -614,12 +562,12 @@ class TableExtractor:
                 
                 # Try to extract numeric values (quantity, price, total) from other columns
                 numeric_values = []
-                for col_idx, cell_value in enumerate(row_data):
+                for col_idx, cell_str in enumerate(cell_strs):
                     if col_idx == product_code_column:
                         continue
                     
                     # Parse numeric values
-                    parsed_value = self._parse_numeric_field(cell_value)
+                    parsed_value = self._parse_numeric_field(cell_str)
                     if parsed_value and float(parsed_value) > 0:
                         numeric_values.append(parsed_value)
                 
@@ -630,7 +578,7 @@ class TableExtractor:
                     
                     # Build description from additional lines in product code cell
                     description_parts = []
-                    cell_lines = str(row_data.iloc[product_code_column]).split('\n')
+                    cell_lines = str(row_data[product_code_column]).split('\n')
                     for line in cell_lines[1:]:  # Skip first line (product code)
                         line = line.strip()
                         if line and line.lower() != 'nan':
@@ -648,20 +596,21 @@ class TableExtractor:
                         product.quantity = numeric_values[-3]     # Third to last is typically quantity
                     
                     # Try to find unit of measure in text
-                    for cell_value in row_data:
-                        cell_str = str(cell_value).strip().upper()
-                        if any(unit in cell_str for unit in ['MT', 'KG', 'PZ', 'NR', 'KM']):
+                    for cell_str in cell_strs:
+                        cell_str = cell_str.upper()
+                        if _UNIT_OF_MEASURE_RE.search(cell_str):
                             product.unit_of_measure = cell_str
                             break
                     
                     products.append(product)
-                    logger.debug(f"Extracted product: {product.product_code} - Qty: {product.quantity}, Price: {product.total_price}")
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Extracted product: %s - Qty: %s, Price: %s", product.product_code, product.quantity, product.total_price)
                     
             except Exception as e:
                 logger.warning(f"Error extracting product from row {row_index} in table {table_index + 1}: {e}")
                 continue
         
-        logger.debug(f"Extracted {len(products)} products from table {table_index + 1}")
+        logger.debug("Extracted %s products from table %s", len(products), table_index + 1)
         return products
     
     def _extract_products_from_text(self, raw_text: str) -> List[ProductData]:
@@ -679,7 +628,7 @@ class TableExtractor:
                 line = lines[i].strip()
                 
                 # Look for product code patterns
-                if re.match(r'^MMA\d+\.\d+\.\d+', line):
+                if _MMA_PRODUCT_CODE_RE.match(line):
                     product = ProductData()
                     product_code_lines = [line]
                     
@@ -706,7 +655,8 @@ class TableExtractor:
                     # Only add product if we have at least product code and some numeric data
                     if product.product_code and (product.quantity or product.unit_price or product.total_price):
                         products.append(product)
-                        logger.debug(f"Text extraction found product: {product.product_code[:20]}...")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Text extraction found product: %s...", product.product_code[:20])
                 
                 i += 1
             
@@ -720,42 +670,25 @@ class TableExtractor:
     def _find_description_for_product(self, lines: List[str], product_line_index: int, product_code: str) -> str:
         """Find description for a specific product code in the text."""
         
-        # For this specific invoice format, look for description patterns
-        # Descriptions like "Interno adesivo - Rinforzo colli" appear near product codes
-        description_patterns = [
-            r'Interno adesivo.*',
-            r'Filo per impunture.*',
-            r'Etichetta a nr.*',
-            r'Particolare per confezione.*',
-            r'Sigillo.*',
-            r'Tessuto.*',
-            r'Bottone.*',
-            r'Materiale da imballo.*',
-            r'Passamaneria.*'
-        ]
-        
         # Search in a window around the product code
         start_line = max(0, product_line_index - 10)
         end_line = min(len(lines), product_line_index + 20)
         
-        found_descriptions = []
-        
         for i in range(start_line, end_line):
             line = lines[i].strip()
             
-            for pattern in description_patterns:
-                if re.match(pattern, line, re.IGNORECASE):
-                    # Check if this description is close to our product code
-                    # Look for Alt. (cm) info on the next line
-                    desc_parts = [line]
-                    if i + 1 < len(lines) and 'Alt. (cm):' in lines[i + 1]:
-                        desc_parts.append(lines[i + 1].strip())
-                    
-                    found_descriptions.append('\n'.join(desc_parts))
-                    break
+            # One alternation match instead of trying each description pattern in turn
+            if _DESCRIPTION_LINE_RE.match(line):
+                # Check if this description is close to our product code
+                # Look for Alt. (cm) info on the next line
+                desc_parts = [line]
+                if i + 1 < len(lines) and 'Alt. (cm):' in lines[i + 1]:
+                    desc_parts.append(lines[i + 1].strip())
+                
+                # Return the first relevant description found
+                return '\n'.join(desc_parts)
         
-        # Return the first relevant description found
-        return found_descriptions[0] if found_descriptions else None
+        return None
     
     def _extract_numeric_data_for_product(self, lines: List[str], product_line_index: int, product_code: str) -> Dict[str, str]:
         """Extract numeric data (quantity, price, total) for a specific product."""
@@ -782,7 +715,7 @@ class TableExtractor:
             check_line = lines[k].strip()
             
             # Look for numeric values with Italian decimal format
-            if re.match(r'^\d+[.,]\d+$', check_line):
+            if _ITALIAN_NUMBER_LINE_RE.match(check_line):
                 try:
                     from ..utils.helpers import parse_italian_decimal
                     parsed = parse_italian_decimal(check_line)
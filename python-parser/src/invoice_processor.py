@@ -1,16 +1,23 @@
 import logging
-from typing import Dict, Any
-from .models.invoice_models import ExtractionResult, ProcessingConfig
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, Any, List, Optional, Tuple
+from .models.invoice_models import ExtractionResult, PageData, ProcessingConfig
 from .extractors.metadata_extractor import MetadataExtractor
 from .extractors.table_extractor import TableExtractor
 from .extractors.response_compiler import ResponseCompiler
 from .validators.ocr_validator import OCRValidator
-from .utils.pdf_utils import split_pdf_into_pages, validate_pdf_file
+from .utils.pdf_utils import PdfSource, describe_pdf_source, pdf_path_for, split_pdf_into_pages, validate_pdf_file
 from .utils.config import ConfigManager
 
 logger = logging.getLogger(__name__)
 
 
+def _extract_page(pdf_path: str, page_number: int, config: ProcessingConfig) -> PageData:
+    """Extract a single page in a worker process. Must stay top-level so it can be pickled."""
+    return TableExtractor(config).extract_page_data(pdf_path, page_number)
+
+
 class InvoiceProcessor:
     """Main orchestrator for the step-by-step invoice processing pipeline."""
     
@@ -22,39 +29,51 @@ class InvoiceProcessor:
         self.table_extractor = TableExtractor(self.config)
         self.ocr_validator = OCRValidator(self.config)
         self.response_compiler = ResponseCompiler(self.config)
+        
+        # Created lazily so a processor built before a fork (e.g. Gunicorn preload) never shares a pool
+        self._page_executor: Optional[ProcessPoolExecutor] = None
     
-    def process_invoice(self, pdf_path: str) -> Dict[str, Any]:
+    def process_invoice(self, pdf_source: PdfSource) -> Dict[str, Any]:
         """
         Main entry point for processing an invoice PDF.
+        Accepts either a file path or an in-memory binary stream (e.g. BytesIO).
         Returns a Laravel-compatible response dictionary.
         """
-        logger.info(f"Starting invoice processing for: {pdf_path}")
+        laravel_response, _ = self.process_invoice_with_result(pdf_source)
+        return laravel_response
+    
+    def process_invoice_with_result(self, pdf_source: PdfSource) -> Tuple[Dict[str, Any], ExtractionResult]:
+        """
+        Process an invoice PDF and return both the Laravel-compatible response and
+        the underlying ExtractionResult (e.g. for get_processing_stats).
+        """
+        logger.info(f"Starting invoice processing for: {describe_pdf_source(pdf_source)}")
         
         try:
-            # Step 0: Validate PDF file
-            if not validate_pdf_file(pdf_path):
-                return self._create_error_response("Invalid or unreadable PDF file")
+            # Step 0: Validate PDF file; this reads the page tree once and the count is reused below
+            page_count = validate_pdf_file(pdf_source)
+            if page_count is None:
+                return self._create_error_result("Invalid or unreadable PDF file")
+            
+            # Both the metadata and page steps reuse the count
+            page_numbers = split_pdf_into_pages(pdf_source, page_count)
+            if not page_numbers:
+                return self._create_error_result("Could not determine PDF page structure")
             
             # Step 1: Extract general metadata
             logger.info("Step 1: Extracting general metadata...")
-            bill_data = self.metadata_extractor.extract_general_metadata(pdf_path)
+            bill_data = self.metadata_extractor.extract_general_metadata(pdf_source, page_count=len(page_numbers))
             
-            # Step 2: Split PDF into pages and process each page
+            # Step 2: Process each page
             logger.info("Step 2: Processing pages...")
-            page_numbers = split_pdf_into_pages(pdf_path)
-            if not page_numbers:
-                return self._create_error_response("Could not determine PDF page structure")
-            
             # Apply max pages limit if configured
             if self.config.max_pages_to_process:
                 page_numbers = page_numbers[:self.config.max_pages_to_process]
                 logger.info(f"Limited processing to {len(page_numbers)} pages")
             
-            page_data_list = []
-            for page_num in page_numbers:
-                logger.info(f"Processing page {page_num + 1}...")
-                page_data = self.table_extractor.extract_page_data(pdf_path, page_num)
-                page_data_list.append(page_data)
+            # Camelot can only read from a path, so in-memory sources are spilled once here
+            with pdf_path_for(pdf_source) as pdf_path:
+                page_data_list = self._extract_pages(pdf_path, page_numbers)
             
             # Step 3: OCR validation for each page
             logger.info("Step 3: Validating extracted data...")
@@ -69,19 +88,49 @@ class InvoiceProcessor:
             # Step 4: Compile final response
             logger.info("Step 4: Compiling final response...")
             extraction_result = self.response_compiler.compile_final_result(
-                bill_data, page_data_list, validation_results, pdf_path
+                bill_data, page_data_list, validation_results, describe_pdf_source(pdf_source)
             )
             
             # Convert to Laravel format
             laravel_response = self.response_compiler.convert_to_laravel_format(extraction_result)
             
             logger.info(f"Invoice processing completed. Success: {extraction_result.success}")
-            return laravel_response
+            return laravel_response, extraction_result
             
         except Exception as e:
             error_msg = f"Unhandled error during invoice processing: {str(e)}"
             logger.error(error_msg, exc_info=True)
-            return self._create_error_response(error_msg)
+            return self._create_error_result(error_msg)
+    
+    def _extract_pages(self, pdf_path: str, page_numbers: List[int]) -> List[PageData]:
+        """Extract page data sequentially, or across a process pool when page_workers > 1."""
+        
+        workers = self.config.page_workers
+        if workers <= 1 or len(page_numbers) < 2:
+            page_data_list = []
+            for page_num in page_numbers:
+                logger.info(f"Processing page {page_num + 1}...")
+                page_data_list.append(self.table_extractor.extract_page_data(pdf_path, page_num))
+            return page_data_list
+        
+        if self._page_executor is None:
+            self._page_executor = ProcessPoolExecutor(max_workers=workers)
+        
+        logger.info(f"Processing {len(page_numbers)} pages across {workers} worker processes...")
+        chunksize = max(1, len(page_numbers) // (4 * workers))
+        return list(self._page_executor.map(
+            _extract_page, repeat(pdf_path), page_numbers, repeat(self.config), chunksize=chunksize
+        ))
+    
+    def _create_error_result(self, error_message: str) -> Tuple[Dict[str, Any], ExtractionResult]:
+        """Create the error response together with a matching failed ExtractionResult."""
+        extraction_result = ExtractionResult(
+            success=False,
+            extraction_method="failed",
+            parsing_errors=[error_message],
+            message="Invoice processing failed"
+        )
+        return self._create_error_response(error_message), extraction_result
     
     def _create_error_response(self, error_message: str) -> Dict[str, Any]:
         """Create a standardized error response."""
@@ -95,4 +95,6 @@ class ProcessingConfig:
     table_extraction_flavor: str = "lattice"
     line_scale: int = 30
     max_pages_to_process: Optional[int] = None
-    validate_checksums: bool = True
\ No newline at end of file
+    validate_checksums: bool = True
+    page_workers: int = 1
+    response_cache_size: int = 256
@@ -1,6 +1,8 @@
 import os
 import logging
-from typing import Optional
+from dataclasses import replace
+from functools import lru_cache
+from typing import Optional, Tuple
 from ..models.invoice_models import ProcessingConfig
 
 logger = logging.getLogger(__name__)
@@ -9,9 +11,32 @@ logger = logging.getLogger(__name__)
 class ConfigManager:
     """Manages configuration for the invoice processing pipeline."""
     
+    # Environment variables that make up the configuration
+    ENV_KEYS = (
+        "ENABLE_OCR_VALIDATION",
+        "OCR_CONFIDENCE_THRESHOLD",
+        "TABLE_EXTRACTION_FLAVOR",
+        "LINE_SCALE",
+        "MAX_PAGES_TO_PROCESS",
+        "VALIDATE_CHECKSUMS",
+        "PAGE_WORKERS",
+        "RESPONSE_CACHE_SIZE",
+    )
+    
     @staticmethod
     def load_config() -> ProcessingConfig:
-        """Load configuration from environment variables with sensible defaults."""
+        """
+        Load configuration from environment variables with sensible defaults.
+        The parsed values are cached and only rebuilt when one of ENV_KEYS changes;
+        each caller gets its own copy, so changing a field never leaks to other callers.
+        """
+        env_snapshot = tuple(os.environ.get(key) for key in ConfigManager.ENV_KEYS)
+        return replace(ConfigManager._load_config_cached(env_snapshot))
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _load_config_cached(env_snapshot: Tuple[Optional[str], ...]) -> ProcessingConfig:
+        """Build the configuration; env_snapshot is only used as the cache key."""
         
         config = ProcessingConfig()
         
@@ -25,6 +50,8 @@ class ConfigManager:
         
         # Processing limits
         config.max_pages_to_process = ConfigManager._get_optional_int_env("MAX_PAGES_TO_PROCESS", None)
+        config.page_workers = ConfigManager._get_int_env("PAGE_WORKERS", 1)
+        config.response_cache_size = ConfigManager._get_int_env("RESPONSE_CACHE_SIZE", 256)
         
         # Validation settings
         config.validate_checksums = ConfigManager._get_bool_env("VALIDATE_CHECKSUMS", True)
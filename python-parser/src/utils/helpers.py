@@ -1,10 +1,29 @@
 import re
+import json
 import logging
+from functools import lru_cache
 from decimal import Decimal, InvalidOperation
-from typing import Optional, Union
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Italian separators: drop thousands dots and turn the decimal comma into a dot in one pass
+_ITALIAN_SEPARATORS = str.maketrans({'.': None, ',': '.'})
+
+# Numeric part of a value with surrounding text, e.g. "126,91 EUR"
+_NUMERIC_PART_RE = re.compile(r'([-+]?\d*[.,]?\d+)')
+
+
+@lru_cache(maxsize=256)
+def cached_regex(pattern: str, flags: int = 0) -> "re.Pattern":
+    """Compile a pattern built at runtime, reusing the compiled object on repeat calls."""
+    return re.compile(pattern, flags)
+
 
 def parse_italian_decimal(text_value: Union[str, int, float, Decimal, None]) -> Optional[Decimal]:
     """Converts Italian-style numbers (e.g., '1.234,56') to Decimal. Returns None if invalid."""
@@ -22,10 +41,6 @@ def parse_italian_decimal(text_value: Union[str, int, float, Decimal, None]) ->
     if not cleaned_value:
         return None
 
-    # Debug logging for problematic values
-    if "126" in cleaned_value or "1269" in cleaned_value:
-        logger.debug(f"Parsing potential problematic value: '{cleaned_value}'")
-
     try:
         # Enhanced Italian decimal parsing
         # Handle different cases:
@@ -37,13 +52,11 @@ def parse_italian_decimal(text_value: Union[str, int, float, Decimal, None]) ->
         if ',' in cleaned_value and '.' in cleaned_value:
             # Both comma and dot present: dot is thousands separator, comma is decimal
             # Example: "1.234,56" -> "1234.56"
-            parts = cleaned_value.split(',')
-            if len(parts) == 2:
-                integer_part = parts[0].replace('.', '')
-                decimal_part = parts[1]
-                standardized_value = f"{integer_part}.{decimal_part}"
+            integer_part, _, decimal_part = cleaned_value.partition(',')
+            if ',' in decimal_part:
+                standardized_value = cleaned_value.translate(_ITALIAN_SEPARATORS)
             else:
-                standardized_value = cleaned_value.replace('.', '').replace(',', '.')
+                standardized_value = integer_part.replace('.', '') + '.' + decimal_part
         elif ',' in cleaned_value:
             # Only comma present: it's the decimal separator
             # Example: "126,911" -> "126.911"
@@ -52,17 +65,11 @@ def parse_italian_decimal(text_value: Union[str, int, float, Decimal, None]) ->
             # Only dots or no separators: assume it's already in correct format
             standardized_value = cleaned_value
             
-        result = Decimal(standardized_value)
-        
-        # Debug logging for problematic values
-        if "126" in cleaned_value or "1269" in cleaned_value:
-            logger.debug(f"Parsed '{cleaned_value}' -> '{standardized_value}' -> {result}")
-            
-        return result
+        return Decimal(standardized_value)
         
     except InvalidOperation:
         # Fallback: if there's extra text, try to extract just the numeric part
-        match = re.search(r'([-+]?\d*[.,]?\d+)', cleaned_value)
+        match = _NUMERIC_PART_RE.search(cleaned_value)
         if match:
             try:
                 fallback_value = match.group(1).replace(',', '.')
@@ -83,6 +90,13 @@ def decimal_to_string_default(obj):
     raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
 
 
+def to_json_bytes(payload: Any) -> bytes:
+    """Serialize a response payload to UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=decimal_to_string_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=decimal_to_string_default).encode('utf-8')
+
+
 def clean_string_field(value: str) -> Optional[str]:
     """Clean and validate string fields, return None for empty or 'nan' values."""
     if not value or not isinstance(value, str):
@@ -100,7 +114,7 @@ def extract_numeric_from_filename(filename: str, pattern: str) -> Optional[Union
     if not filename:
         return None
     
-    match = re.search(pattern, filename)
+    match = cached_regex(pattern).search(filename)
     if match:
         try:
             value = match.group(1)
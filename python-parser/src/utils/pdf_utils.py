@@ -1,24 +1,85 @@
 import os
+import shutil
 import logging
-from typing import List, Optional
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional, Union
 from PyPDF2 import PdfReader
 from pdfminer.high_level import extract_text
 from pdfminer.layout import LAParams
 
+try:
+    import pymupdf as fitz
+except ImportError:
+    try:
+        import fitz  # PyMuPDF releases before the `pymupdf` module name
+    except ImportError:
+        fitz = None
+
 logger = logging.getLogger(__name__)
 
+# A PDF can be given either as a filesystem path or as an in-memory binary stream
+PdfSource = Union[str, BinaryIO]
+
+# Spill in-memory PDFs to tmpfs when available; /tmp is often a slow overlay in containers.
+# PDF_SPILL_DIR overrides the directory; a full spill directory falls back to the default temp dir.
+_SPILL_DIR = os.environ.get('PDF_SPILL_DIR') or ('/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+
+def describe_pdf_source(pdf_source: PdfSource) -> str:
+    """Return a human-readable name for a PDF source, for log messages."""
+    return pdf_source if isinstance(pdf_source, str) else "<in-memory PDF>"
+
+
+@contextmanager
+def pdf_path_for(pdf_source: PdfSource) -> Iterator[str]:
+    """
+    Yield a filesystem path for the PDF.
+    Paths are passed through; in-memory streams are written to a temporary
+    file (on /dev/shm when available) for tools that can only open paths (e.g. Camelot).
+    """
+    if isinstance(pdf_source, str):
+        yield pdf_source
+        return
+    
+    try:
+        tmp_path = _write_temp_pdf(pdf_source, _SPILL_DIR)
+    except OSError as e:
+        if _SPILL_DIR is None:
+            raise
+        # tmpfs is small in containers (64 MB /dev/shm by default) and shared by all workers
+        logger.warning(f"Could not spill PDF to {_SPILL_DIR} ({e}), using the default temp directory")
+        tmp_path = _write_temp_pdf(pdf_source, None)
+    try:
+        yield tmp_path
+    finally:
+        os.unlink(tmp_path)
+
 
-def get_pdf_page_count(pdf_path: str) -> int:
+def _write_temp_pdf(pdf_source: BinaryIO, directory: Optional[str]) -> str:
+    """Copy a PDF stream to a new temporary file in directory and return its path."""
+    fd, tmp_path = tempfile.mkstemp(suffix='.pdf', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file_obj:
+            pdf_source.seek(0)
+            shutil.copyfileobj(pdf_source, tmp_file_obj)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+def get_pdf_page_count(pdf_path: PdfSource) -> int:
     """Get the total number of pages in a PDF file."""
     try:
         reader = PdfReader(pdf_path)
         return len(reader.pages)
     except Exception as e:
-        logger.error(f"Error reading PDF page count from {pdf_path}: {e}")
+        logger.error(f"Error reading PDF page count from {describe_pdf_source(pdf_path)}: {e}")
         return 0
 
 
-def extract_text_from_page(pdf_path: str, page_number: int) -> str:
+def extract_text_from_page(pdf_path: PdfSource, page_number: int) -> str:
     """
     Extract text from a specific page (0-indexed).
     Returns empty string if extraction fails.
@@ -28,11 +89,34 @@ def extract_text_from_page(pdf_path: str, page_number: int) -> str:
         text = extract_text(pdf_path, page_numbers=[page_number], laparams=LAParams())
         return text or ""
     except Exception as e:
-        logger.warning(f"Text extraction failed for page {page_number + 1} of {pdf_path}: {e}")
+        logger.warning(f"Text extraction failed for page {page_number + 1} of {describe_pdf_source(pdf_path)}: {e}")
         return ""
 
 
-def extract_text_from_pages(pdf_path: str, page_numbers: List[int]) -> dict:
+def extract_page_text_fast(pdf_path: PdfSource, page_number: int) -> str:
+    """
+    Extract plain text from a specific page (0-indexed) using PyMuPDF.
+    Much faster than pdfminer's layout analysis; used for the header/metadata
+    text where reading order is all that matters. Falls back to pdfminer when
+    PyMuPDF is unavailable or fails.
+    """
+    if fitz is None:
+        return extract_text_from_page(pdf_path, page_number)
+    
+    try:
+        if isinstance(pdf_path, str):
+            doc = fitz.open(pdf_path)
+        else:
+            pdf_path.seek(0)
+            doc = fitz.open(stream=pdf_path.read(), filetype="pdf")
+        with doc:
+            return doc[page_number].get_text("text") or ""
+    except Exception as e:
+        logger.warning(f"PyMuPDF text extraction failed for page {page_number + 1} of {describe_pdf_source(pdf_path)}, falling back to pdfminer: {e}")
+        return extract_text_from_page(pdf_path, page_number)
+
+
+def extract_text_from_pages(pdf_path: PdfSource, page_numbers: List[int]) -> dict:
     """
     Extract text from multiple pages.
     Returns dict with page numbers as keys and text as values.
@@ -45,35 +129,42 @@ def extract_text_from_pages(pdf_path: str, page_numbers: List[int]) -> dict:
     return result
 
 
-def split_pdf_into_pages(pdf_path: str) -> List[int]:
+def split_pdf_into_pages(pdf_path: PdfSource, page_count: Optional[int] = None) -> List[int]:
     """
     Get list of page indices for processing.
-    Returns list of 0-indexed page numbers.
+    Returns list of 0-indexed page numbers. Pass page_count (e.g. from
+    validate_pdf_file) to avoid reading the page tree again.
     """
-    page_count = get_pdf_page_count(pdf_path)
+    if page_count is None:
+        page_count = get_pdf_page_count(pdf_path)
     if page_count == 0:
-        logger.error(f"Could not determine page count for {pdf_path}")
+        logger.error(f"Could not determine page count for {describe_pdf_source(pdf_path)}")
         return []
     
     return list(range(page_count))
 
 
-def validate_pdf_file(pdf_path: str) -> bool:
-    """Validate that the file exists and is a readable PDF."""
-    if not os.path.exists(pdf_path):
-        logger.error(f"PDF file does not exist: {pdf_path}")
-        return False
-    
-    if not pdf_path.lower().endswith('.pdf'):
-        logger.error(f"File is not a PDF: {pdf_path}")
-        return False
+def validate_pdf_file(pdf_path: PdfSource) -> Optional[int]:
+    """
+    Validate that the file exists (for paths) and is a readable PDF.
+    Returns its page count, or None if it is missing or unreadable.
+    """
+    if isinstance(pdf_path, str):
+        if not os.path.exists(pdf_path):
+            logger.error(f"PDF file does not exist: {pdf_path}")
+            return None
+        
+        if not pdf_path.lower().endswith('.pdf'):
+            logger.error(f"File is not a PDF: {pdf_path}")
+            return None
     
     try:
         reader = PdfReader(pdf_path)
+        page_count = len(reader.pages)
         # Try to access the first page to ensure it's readable
-        if len(reader.pages) > 0:
+        if page_count > 0:
             _ = reader.pages[0]
-        return True
+        return page_count
     except Exception as e:
-        logger.error(f"PDF file appears to be corrupted or unreadable: {pdf_path}, error: {e}")
-        return False
\ No newline at end of file
+        logger.error(f"PDF file appears to be corrupted or unreadable: {describe_pdf_source(pdf_path)}, error: {e}")
+        return None
\ No newline at end of file
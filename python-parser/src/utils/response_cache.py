@@ -0,0 +1,50 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+try:
+    import xxhash
+except ImportError:  # fall back to the standard library hash
+    xxhash = None
+
+
+def content_key(data: bytes) -> str:
+    """Return a hash of the uploaded bytes to key the response cache."""
+    if xxhash is not None:
+        return xxhash.xxh3_64(data).hexdigest()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """
+    Bounded, thread-safe LRU of serialized responses keyed by upload content.
+    Each Gunicorn worker keeps its own instance; nothing is shared between processes.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached response for key, or None on a miss."""
+        if self.maxsize <= 0:
+            return None
+
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: str, body: bytes) -> None:
+        """Store a response, evicting the least recently used entry when full."""
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
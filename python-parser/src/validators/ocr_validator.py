@@ -71,25 +71,21 @@ class OCRValidator:
         total_products = len(products)
         
         for i, product in enumerate(products):
-            # Validate numeric fields
-            quantity_valid = self._validate_numeric_field(product.quantity, "quantity", i)
-            unit_price_valid = self._validate_numeric_field(product.unit_price, "unit_price", i)
-            total_price_valid = self._validate_numeric_field(product.total_price, "total_price", i)
+            # Validate numeric fields, parsing each one only once
+            quantity = self._parse_numeric_field(product.quantity)
+            unit_price = self._parse_numeric_field(product.unit_price)
+            total_price = self._parse_numeric_field(product.total_price)
             
-            if not (quantity_valid and unit_price_valid and total_price_valid):
+            if quantity is None or unit_price is None or total_price is None:
                 errors.append(f"Product {i + 1}: Invalid numeric fields")
                 continue
             
             # Validate calculation: quantity * unit_price ≈ total_price
-            if product.quantity and product.unit_price and product.total_price:
-                calc_error = self._validate_price_calculation(product, i)
-                if calc_error:
-                    errors.append(calc_error)
-                else:
-                    valid_products += 1
+            calc_error = self._validate_price_calculation(quantity, unit_price, total_price, i)
+            if calc_error:
+                errors.append(calc_error)
             else:
-                # Missing critical fields
-                errors.append(f"Product {i + 1}: Missing critical pricing fields")
+                valid_products += 1
         
         consistency_score = valid_products / total_products if total_products > 0 else 0
         
@@ -100,41 +96,35 @@ class OCRValidator:
             'total_products': total_products
         }
     
-    def _validate_numeric_field(self, field_value: Optional[str], field_name: str, product_index: int) -> bool:
-        """Validate that a numeric field can be parsed correctly."""
+    def _parse_numeric_field(self, field_value: Optional[str]) -> Optional[Decimal]:
+        """Parse a numeric field, returning None unless it is a finite, non-negative number."""
         
         if not field_value:
-            return False
+            return None
         
-        try:
-            parsed = parse_italian_decimal(field_value)
-            return parsed is not None and parsed >= 0
-        except Exception:
-            return False
+        # parse_italian_decimal does not raise; NaN/Infinity are rejected here so the
+        # price arithmetic below needs no exception handling
+        parsed = parse_italian_decimal(field_value)
+        if parsed is None or not parsed.is_finite() or parsed < 0:
+            return None
+        return parsed
     
-    def _validate_price_calculation(self, product: ProductData, product_index: int) -> Optional[str]:
+    def _validate_price_calculation(self, quantity: Decimal, unit_price: Decimal, total_price: Decimal,
+                                    product_index: int) -> Optional[str]:
         """Validate that quantity * unit_price ≈ total_price."""
         
-        try:
-            quantity = parse_italian_decimal(product.quantity)
-            unit_price = parse_italian_decimal(product.unit_price)
-            total_price = parse_italian_decimal(product.total_price)
-            
-            if not all([quantity, unit_price, total_price]):
-                return f"Product {product_index + 1}: Cannot parse pricing fields for calculation"
-            
-            calculated_total = quantity * unit_price
-            difference = abs(calculated_total - total_price)
-            tolerance = max(Decimal('0.01'), total_price * Decimal('0.001'))  # 0.1% tolerance or 1 cent minimum
-            
-            if difference > tolerance:
-                return (f"Product {product_index + 1}: Price calculation mismatch. "
-                       f"Expected: {calculated_total}, Found: {total_price}, Difference: {difference}")
-            
-            return None
-            
-        except Exception as e:
-            return f"Product {product_index + 1}: Error validating price calculation: {str(e)}"
+        if not (quantity and unit_price and total_price):
+            return f"Product {product_index + 1}: Cannot parse pricing fields for calculation"
+        
+        calculated_total = quantity * unit_price
+        difference = abs(calculated_total - total_price)
+        tolerance = max(Decimal('0.01'), total_price * Decimal('0.001'))  # 0.1% tolerance or 1 cent minimum
+        
+        if difference > tolerance:
+            return (f"Product {product_index + 1}: Price calculation mismatch. "
+                   f"Expected: {calculated_total}, Found: {total_price}, Difference: {difference}")
+        
+        return None
     
     def _cross_reference_with_text(self, products: List[ProductData], raw_text: str) -> Dict[str, Any]:
         """Cross-reference extracted product data with raw text."""
@@ -0,0 +1,247 @@
+import errno
+import hashlib
+import io
+import os
+import sys
+import time
+import types
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+import app_old
+
+
+def fake_parse_and_convert(pdf_path, include_raw_text=False):
+    """Stands in for the real parser in worker processes; behaviour depends on the file content."""
+    with open(pdf_path, 'rb') as pdf_file:
+        content = pdf_file.read()
+    if b'crash' in content:
+        raise RuntimeError('worker crashed')
+    if b'slow' in content:
+        time.sleep(3)
+    return {'success': True, 'data': {'content': content.decode(), 'raw': include_raw_text}}
+
+
+def marking_parse_and_convert(pdf_path, include_raw_text=False):
+    """Like fake_parse_and_convert, but leaves a marker file once a job has run."""
+    result = fake_parse_and_convert(pdf_path, include_raw_text)
+    open(pdf_path + '.done', 'w').close()
+    return result
+
+
+@pytest.fixture
+def legacy(monkeypatch):
+    monkeypatch.setattr(app_old, 'parse_and_convert', fake_parse_and_convert)
+    monkeypatch.setattr(app_old, '_PARSE_POOL', None)
+    app_old._RESULT_CACHE.clear()
+    yield app_old
+    if app_old._PARSE_POOL is not None:
+        app_old._PARSE_POOL.shutdown()
+    app_old._RESULT_CACHE.clear()
+
+
+def _upload(*contents):
+    return {'file': [(io.BytesIO(content), f'invoice{index}.pdf') for index, content in enumerate(contents)]}
+
+
+def _post(data, query=''):
+    return app_old.app.test_client().post('/parse-invoice' + query, data=data,
+                                          content_type='multipart/form-data')
+
+
+def test_batch_response_keeps_upload_order_and_names_files(legacy):
+    response = _post(_upload(b'%PDF- one', b'%PDF- two'))
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'success': True,
+        'results': [
+            {'success': True, 'data': {'content': '%PDF- one', 'raw': False}, 'file_name': 'invoice0.pdf'},
+            {'success': True, 'data': {'content': '%PDF- two', 'raw': False}, 'file_name': 'invoice1.pdf'},
+        ]
+    }
+
+
+def test_single_upload_returns_the_plain_result(legacy):
+    response = _post(_upload(b'%PDF- one'))
+
+    assert response.get_json() == {'success': True, 'data': {'content': '%PDF- one', 'raw': False}}
+
+
+def test_worker_error_becomes_an_error_entry(legacy):
+    body = _post(_upload(b'%PDF- one', b'%PDF- crash')).get_json()
+
+    assert body['success'] is False
+    assert body['results'][0]['success'] is True
+    assert body['results'][1]['success'] is False
+    assert body['results'][1]['error'] == 'Internal Server Error: worker crashed'
+    assert body['results'][1]['file_name'] == 'invoice1.pdf'
+
+
+def test_timeout_gives_an_error_entry_and_replaces_the_pool(legacy, monkeypatch, tmp_path):
+    monkeypatch.setattr(app_old, 'PARSE_BATCH_TIMEOUT', 1)
+    paths = []
+    for name, content in (('fast.pdf', b'%PDF- fast'), ('slow.pdf', b'%PDF- slow')):
+        path = tmp_path / name
+        path.write_bytes(content)
+        paths.append(str(path))
+
+    pool = app_old._get_parse_pool()
+    started = time.monotonic()
+    results = app_old._parse_batch(paths, ['fast.pdf', 'slow.pdf'])
+
+    assert time.monotonic() - started < 3
+    assert results[0]['success'] is True
+    assert results[1]['success'] is False
+    assert results[1]['error'] == 'Timeout'
+    assert app_old._PARSE_POOL is None
+
+    # The next batch runs on a fresh pool
+    assert app_old._parse_batch(paths[:1], ['fast.pdf'])[0]['success'] is True
+    assert app_old._PARSE_POOL is not pool
+
+
+def test_timeout_cancels_jobs_not_yet_started(legacy, monkeypatch, tmp_path):
+    monkeypatch.setattr(app_old, 'parse_and_convert', marking_parse_and_convert)
+    monkeypatch.setattr(app_old, 'PARSE_BATCH_TIMEOUT', 1)
+    monkeypatch.setattr(app_old.os, 'cpu_count', lambda: 1)
+    names = ['slow.pdf'] + [f'queued{index}.pdf' for index in range(4)]
+    paths = []
+    for name in names:
+        path = tmp_path / name
+        path.write_bytes(b'%PDF- slow' if name == 'slow.pdf' else b'%PDF- queued')
+        paths.append(str(path))
+
+    results = app_old._parse_batch(paths, names)
+    assert all(result['error'] == 'Timeout' for result in results)
+
+    # The running job is left to finish in the retired pool; the jobs still queued are not
+    deadline = time.monotonic() + 10
+    while not os.path.exists(paths[0] + '.done') and time.monotonic() < deadline:
+        time.sleep(0.1)
+    time.sleep(0.5)
+    assert os.path.exists(paths[0] + '.done')
+    assert not os.path.exists(paths[-1] + '.done')
+
+
+def test_get_parse_pool_reuses_one_pool(legacy):
+    assert app_old._get_parse_pool() is app_old._get_parse_pool()
+
+
+@pytest.fixture
+def counting_parser(legacy, monkeypatch):
+    calls = []
+
+    def parse_and_convert(pdf_path, include_raw_text=False):
+        calls.append(include_raw_text)
+        return fake_parse_and_convert(pdf_path, include_raw_text)
+
+    monkeypatch.setattr(app_old, 'parse_and_convert', parse_and_convert)
+    return calls
+
+
+def test_identical_upload_is_served_from_the_result_cache(counting_parser):
+    first = _post(_upload(b'%PDF- one'))
+    second = _post(_upload(b'%PDF- one'))
+
+    assert first.data == second.data
+    assert counting_parser == [False]
+
+
+def test_debug_results_are_cached_separately(counting_parser):
+    _post(_upload(b'%PDF- one'))
+    body = _post(_upload(b'%PDF- one'), '?debug=1').get_json()
+
+    assert body['data']['raw'] is True
+    assert counting_parser == [False, True]
+
+
+def test_error_results_are_not_cached(legacy, monkeypatch):
+    calls = []
+
+    def parse_and_convert(pdf_path, include_raw_text=False):
+        calls.append(pdf_path)
+        return {'success': False, 'error': 'Timeout', 'message': 'Parsing did not finish.'}
+
+    monkeypatch.setattr(app_old, 'parse_and_convert', parse_and_convert)
+    _post(_upload(b'%PDF- one'))
+    _post(_upload(b'%PDF- one'))
+
+    assert len(calls) == 2
+
+
+def test_result_cache_evicts_least_recently_used(legacy, monkeypatch):
+    monkeypatch.setattr(app_old, 'RESULT_CACHE_SIZE', 2)
+    app_old._cache_put('a', {'success': True})
+    app_old._cache_put('b', {'success': True})
+    app_old._cache_get('a')
+    app_old._cache_put('c', {'success': True})
+
+    assert app_old._cache_get('b') is None
+    assert app_old._cache_get('a') == {'success': True}
+    assert app_old._cache_get('c') == {'success': True}
+
+
+def test_oversized_upload_gets_413(legacy, monkeypatch):
+    monkeypatch.setitem(app_old.app.config, 'MAX_CONTENT_LENGTH', 1024 * 1024)
+    monkeypatch.setattr(app_old, 'MAX_UPLOAD_MB', 1)
+
+    response = _post(_upload(b'%PDF-' + b'0' * (2 * 1024 * 1024)))
+
+    assert response.status_code == 413
+    assert response.get_json() == {
+        'success': False,
+        'error': 'File too large',
+        'message': 'Uploads are limited to 1 MB in total.'
+    }
+
+
+def test_upload_falls_back_to_default_temp_dir_when_spill_dir_is_full(monkeypatch, tmp_path):
+    full_dir = tmp_path / 'shm'
+    full_dir.mkdir()
+    monkeypatch.setattr(app_old, '_UPLOAD_DIR', str(full_dir))
+    write_upload = app_old._write_upload
+
+    def write_or_fail(stream, directory):
+        if directory == str(full_dir):
+            stream.read(3)  # fail part-way through the copy
+            raise OSError(errno.ENOSPC, 'No space left on device')
+        return write_upload(stream, directory)
+
+    monkeypatch.setattr(app_old, '_write_upload', write_or_fail)
+    data = b'%PDF-1.4 invoice'
+
+    path, digest = app_old._save_upload(FileStorage(io.BytesIO(data), 'invoice.pdf'))
+    try:
+        assert os.path.dirname(path) != str(full_dir)
+        with open(path, 'rb') as pdf_file:
+            assert pdf_file.read() == data
+        assert digest == hashlib.sha256(data).hexdigest()
+    finally:
+        os.unlink(path)
+
+
+
+class FakeTableList(list):
+    @property
+    def n(self):
+        return len(self)
+
+
+def test_camelot_tables_are_read_in_page_batches(monkeypatch):
+    requested_pages = []
+
+    def read_pdf(pdf_path, pages, **kwargs):
+        requested_pages.append(pages)
+        first_page, last_page = map(int, pages.split('-'))
+        return FakeTableList(types.SimpleNamespace(page=str(page), df=f'table on page {page}')
+                             for page in range(first_page, last_page + 1))
+
+    monkeypatch.setitem(sys.modules, 'camelot', types.SimpleNamespace(read_pdf=read_pdf))
+    monkeypatch.setattr(app_old, '_CAMELOT_PAGE_BATCH', 2)
+
+    tables_by_page = app_old.extract_tables_by_page_camelot('invoice.pdf', 5)
+
+    assert requested_pages == ['1-2', '3-4', '5-5']
+    assert dict(tables_by_page) == {page: [f'table on page {page}'] for page in range(1, 6)}
@@ -0,0 +1,19 @@
+from src.utils.config import ConfigManager
+
+
+def test_load_config_reads_environment(monkeypatch):
+    monkeypatch.setenv('PAGE_WORKERS', '3')
+    monkeypatch.setenv('TABLE_EXTRACTION_FLAVOR', 'stream')
+
+    config = ConfigManager.load_config()
+
+    assert config.page_workers == 3
+    assert config.table_extraction_flavor == 'stream'
+
+
+def test_callers_get_independent_copies():
+    first = ConfigManager.load_config()
+    first.line_scale = 1
+
+    assert ConfigManager.load_config().line_scale != 1
+    assert ConfigManager.load_config() is not ConfigManager.load_config()
@@ -0,0 +1,57 @@
+from src.extractors.table_extractor import TableExtractor
+from src.models.invoice_models import DeliveryData, PageData, ProcessingConfig, ProductData
+
+
+def _associate(raw_text, deliveries, product_codes):
+    products = [ProductData(product_code=code) for code in product_codes]
+    page_data = PageData(page_number=0, raw_text=raw_text, products=products, all_deliveries=deliveries)
+    TableExtractor(ProcessingConfig())._associate_products_with_deliveries(page_data)
+    return products
+
+
+def _codes(delivery):
+    return [product.product_code for product in delivery.products]
+
+
+def test_products_go_to_the_closest_preceding_delivery():
+    first = DeliveryData(ddt_series='MS5LH0002', ddt_number='3635')
+    second = DeliveryData(ddt_series='MS5LH0002', ddt_number='3636')
+    raw_text = ("DDT MS5LH0002 3635\nMMA1.1.1 Tessuto\nMMA1.1.2 Bottone\n"
+                "DDT MS5LH0002 3636\nMMA2.2.2 Sigillo\n")
+
+    _associate(raw_text, [second, first], ['MMA2.2.2', 'MMA1.1.1', 'MMA1.1.2'])
+
+    assert _codes(first) == ['MMA1.1.1', 'MMA1.1.2']
+    assert _codes(second) == ['MMA2.2.2']
+
+
+def test_product_before_every_delivery_falls_back_to_the_first_delivery():
+    first = DeliveryData(ddt_series='MS5LH0002', ddt_number='3635')
+    second = DeliveryData(ddt_series='MS5LH0002', ddt_number='3636')
+    raw_text = "MMA0.0.0 Header item\nMS5LH0002 3636\nMS5LH0002 3635\n"
+
+    _associate(raw_text, [first, second], ['MMA0.0.0'])
+
+    assert _codes(first) == ['MMA0.0.0']
+    assert _codes(second) == []
+
+
+def test_product_missing_from_text_goes_to_the_last_delivery_in_the_text():
+    first = DeliveryData(ddt_series='MS5LH0002', ddt_number='3635')
+    second = DeliveryData(ddt_series='MS5LH0002', ddt_number='3636')
+    raw_text = "MS5LH0002 3635\nMS5LH0002 3636\n"
+
+    _associate(raw_text, [first, second], ['MMA9.9.9'])
+
+    assert _codes(second) == ['MMA9.9.9']
+
+
+def test_deliveries_at_the_same_position_prefer_the_earlier_one():
+    # Neither delivery is found in the text, so both fall back to position 0
+    first = DeliveryData(ddt_series='XX0000001', ddt_number='1111')
+    second = DeliveryData(ddt_series='XX0000002', ddt_number='2222')
+
+    _associate("MMA1.1.1\n", [first, second], ['MMA1.1.1'])
+
+    assert _codes(first) == ['MMA1.1.1']
+    assert _codes(second) == []
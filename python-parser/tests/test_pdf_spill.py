@@ -0,0 +1,42 @@
+import errno
+import io
+import os
+
+import pytest
+
+from src.utils import pdf_utils
+
+
+def test_spill_falls_back_to_default_temp_dir_when_full(monkeypatch, tmp_path):
+    full_dir = tmp_path / 'shm'
+    full_dir.mkdir()
+    monkeypatch.setattr(pdf_utils, '_SPILL_DIR', str(full_dir))
+    write_temp_pdf = pdf_utils._write_temp_pdf
+
+    def write_or_fail(pdf_source, directory):
+        if directory == str(full_dir):
+            raise OSError(errno.ENOSPC, 'No space left on device')
+        return write_temp_pdf(pdf_source, directory)
+
+    monkeypatch.setattr(pdf_utils, '_write_temp_pdf', write_or_fail)
+
+    with pdf_utils.pdf_path_for(io.BytesIO(b'%PDF-1.4 data')) as path:
+        assert os.path.dirname(path) != str(full_dir)
+        with open(path, 'rb') as pdf_file:
+            assert pdf_file.read() == b'%PDF-1.4 data'
+    assert not os.path.exists(path)
+
+
+def test_partial_spill_file_is_removed_on_failure(tmp_path):
+    class FailingStream(io.BytesIO):
+        def read(self, *args):
+            raise OSError(errno.ENOSPC, 'No space left on device')
+
+    with pytest.raises(OSError):
+        pdf_utils._write_temp_pdf(FailingStream(b'%PDF-'), str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_paths_are_passed_through():
+    with pdf_utils.pdf_path_for('/some/invoice.pdf') as path:
+        assert path == '/some/invoice.pdf'
@@ -0,0 +1,33 @@
+import io
+
+from PyPDF2 import PdfWriter
+
+from src.utils.pdf_utils import split_pdf_into_pages, validate_pdf_file
+
+
+def _blank_pdf(pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_validate_returns_page_count():
+    assert validate_pdf_file(_blank_pdf(3)) == 3
+
+
+def test_validate_rejects_unreadable_pdf():
+    assert validate_pdf_file(io.BytesIO(b'%PDF-1.4 truncated')) is None
+
+
+def test_validate_rejects_missing_path(tmp_path):
+    assert validate_pdf_file(str(tmp_path / 'missing.pdf')) is None
+
+
+def test_split_reuses_a_known_page_count():
+    # The stream is never read when the count is passed in
+    assert split_pdf_into_pages(io.BytesIO(b''), page_count=2) == [0, 1]
+    assert split_pdf_into_pages(_blank_pdf(2)) == [0, 1]
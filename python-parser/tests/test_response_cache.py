@@ -0,0 +1,109 @@
+import io
+
+import pytest
+
+from src.utils.response_cache import ResponseCache, content_key
+
+
+def test_content_key_is_stable_and_content_addressed():
+    assert content_key(b'%PDF-1.4 a') == content_key(b'%PDF-1.4 a')
+    assert content_key(b'%PDF-1.4 a') != content_key(b'%PDF-1.4 b')
+
+
+def test_get_returns_none_on_miss():
+    cache = ResponseCache(maxsize=2)
+    assert cache.get('missing') is None
+
+
+def test_evicts_least_recently_used_entry():
+    cache = ResponseCache(maxsize=2)
+    cache.put('a', b'1')
+    cache.put('b', b'2')
+    cache.get('a')  # 'b' is now the least recently used
+    cache.put('c', b'3')
+
+    assert cache.get('a') == b'1'
+    assert cache.get('b') is None
+    assert cache.get('c') == b'3'
+
+
+def test_put_refreshes_existing_key():
+    cache = ResponseCache(maxsize=2)
+    cache.put('a', b'1')
+    cache.put('b', b'2')
+    cache.put('a', b'1-new')
+    cache.put('c', b'3')
+
+    assert cache.get('a') == b'1-new'
+    assert cache.get('b') is None
+
+
+def test_zero_size_disables_cache():
+    cache = ResponseCache(maxsize=0)
+    cache.put('a', b'1')
+    assert cache.get('a') is None
+
+
+@pytest.fixture
+def service(monkeypatch):
+    import app as service_app
+    monkeypatch.setattr(service_app, 'response_cache', ResponseCache(maxsize=8))
+    return service_app
+
+
+def _post_pdf(client, data=b'%PDF-1.4 test'):
+    return client.post('/parse-invoice', data={'file': (io.BytesIO(data), 'invoice.pdf')},
+                       content_type='multipart/form-data')
+
+
+def test_route_caches_successful_responses(service, monkeypatch):
+    calls = []
+
+    def process_invoice(source):
+        calls.append(source)
+        return {'success': True, 'data': {'products': []}, 'message': 'ok'}
+
+    monkeypatch.setattr(service.invoice_processor, 'process_invoice', process_invoice)
+    client = service.app.test_client()
+
+    first = _post_pdf(client)
+    second = _post_pdf(client)
+
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    assert len(calls) == 1
+
+
+def test_route_caches_completed_parses_with_validation_warnings(service, monkeypatch):
+    calls = []
+
+    def process_invoice(source):
+        calls.append(source)
+        return {'success': False,
+                'data': {'extraction_method': 'camelot+pdfminer',
+                         'parsing_errors': ['No total amount found for checksum validation']},
+                'message': 'Invoice processed with warnings'}
+
+    monkeypatch.setattr(service.invoice_processor, 'process_invoice', process_invoice)
+    client = service.app.test_client()
+
+    _post_pdf(client)
+    _post_pdf(client)
+
+    assert len(calls) == 1
+
+
+def test_route_does_not_cache_pipeline_failures(service, monkeypatch):
+    calls = []
+
+    def process_invoice(source):
+        calls.append(source)
+        return service.invoice_processor._create_error_response('No space left on device')
+
+    monkeypatch.setattr(service.invoice_processor, 'process_invoice', process_invoice)
+    client = service.app.test_client()
+
+    _post_pdf(client)
+    _post_pdf(client)
+
+    assert len(calls) == 2
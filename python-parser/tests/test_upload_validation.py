@@ -0,0 +1,98 @@
+import io
+
+import pytest
+
+import app as service_app
+
+
+@pytest.fixture
+def client():
+    return service_app.app.test_client()
+
+
+ROUTES = ['/parse-invoice', '/parse-invoice/stats']
+
+
+def _post(client, route, files):
+    return client.post(route, data=files, content_type='multipart/form-data')
+
+
+@pytest.mark.parametrize('route', ROUTES)
+def test_missing_file_part(client, route):
+    response = _post(client, route, {})
+
+    assert response.status_code == 400
+    assert response.get_json() == {
+        'success': False,
+        'error': 'No file uploaded',
+        'message': 'Please ensure the POST request includes a file with key "file".'
+    }
+
+
+@pytest.mark.parametrize('route', ROUTES)
+def test_empty_filename(client, route):
+    response = _post(client, route, {'file': (io.BytesIO(b'%PDF-1.4'), '')})
+
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'No file selected'
+
+
+@pytest.mark.parametrize('route', ROUTES)
+def test_non_pdf_extension(client, route):
+    response = _post(client, route, {'file': (io.BytesIO(b'%PDF-1.4'), 'invoice.txt')})
+
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['success'] is False
+    assert body['error'] == 'Invalid file type'
+    assert body['message'].endswith('invoice.txt')
+
+
+def test_valid_upload_returns_bytes_and_filename():
+    data = b'%PDF-1.4\n' + b'x' * 4096
+    with service_app.app.test_request_context(
+            '/parse-invoice', method='POST',
+            data={'file': (io.BytesIO(data), 'Invoice.PDF')}, content_type='multipart/form-data'):
+        result = service_app._validate_and_read_pdf(service_app.request)
+
+    assert result == (data, 'Invoice.PDF')
+
+
+def _validate(data):
+    with service_app.app.test_request_context(
+            '/parse-invoice', method='POST',
+            data={'file': (io.BytesIO(data), 'invoice.pdf')}, content_type='multipart/form-data'):
+        return service_app._validate_and_read_pdf(service_app.request)
+
+
+@pytest.mark.parametrize('offset', [0, 1, 1019])
+def test_pdf_header_accepted_within_first_1024_bytes(offset):
+    data = b'\0' * offset + b'%PDF-1.7\n' + b'x' * 2048
+
+    assert _validate(data) == (data, 'invoice.pdf')
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'not a pdf at all',
+    b'\0' * 1020 + b'%PDF-1.7\n',  # header straddles the 1024-byte window
+])
+def test_non_pdf_content_rejected(data):
+    response = _validate(data)
+
+    assert response.status_code == 400
+    assert response.get_json() == {
+        'success': False,
+        'error': 'Not a PDF',
+        'message': 'The uploaded file does not look like a PDF document: invoice.pdf'
+    }
+
+
+def test_non_pdf_content_never_reaches_the_pipeline(client, monkeypatch):
+    def process_invoice(source):
+        raise AssertionError('pipeline should not run for rejected uploads')
+
+    monkeypatch.setattr(service_app.invoice_processor, 'process_invoice', process_invoice)
+    response = _post(client, '/parse-invoice', {'file': (io.BytesIO(b'GIF89a'), 'invoice.pdf')})
+
+    assert response.status_code == 400